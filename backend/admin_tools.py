@@ -0,0 +1,68 @@
+"""
+Admin command line tools sharing one database engine
+
+Usage: python admin_tools.py [--no-pool] <command> [<command> ...]
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Add the app directory to the path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import create_engine_with_pool_config
+from check_meetings import check_meetings
+from check_sessions import check_sessions
+from create_admin_user import create_admin_user
+
+
+COMMANDS = {
+    "check_meetings": check_meetings,
+    "check_sessions": check_sessions,
+    "create_admin_user": create_admin_user,
+}
+
+
+async def run(commands, pooled: bool = True):
+    """Run admin commands in order on one engine, disposing it at exit"""
+    engine = create_engine_with_pool_config(pooled=pooled)
+    async_session = sessionmaker(
+        engine, class_=AsyncSession, expire_on_commit=False
+    )
+
+    try:
+        for command in commands:
+            await command(async_session)
+    finally:
+        await engine.dispose()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "commands",
+        nargs="+",
+        choices=sorted(COMMANDS),
+        metavar="command",
+        help=f"one or more of: {', '.join(sorted(COMMANDS))}",
+    )
+    parser.add_argument(
+        "--no-pool",
+        action="store_true",
+        help="connect without a connection pool (one-shot runs)",
+    )
+    args = parser.parse_args(argv)
+
+    asyncio.run(run(
+        [COMMANDS[name] for name in args.commands],
+        pooled=not args.no_pool,
+    ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+"""Add lat/lng index to meetings
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-15 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Composite index for bounding-box prefiltering in nearby meeting searches
+    op.create_index('ix_meetings_lat_lng', 'meetings', ['lat', 'lng'], unique=False)
+
+
+def downgrade() -> None:
+    # Remove lat/lng index from meetings table
+    op.drop_index('ix_meetings_lat_lng', table_name='meetings')
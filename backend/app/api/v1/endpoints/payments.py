@@ -4,7 +4,8 @@ Payment API endpoints for subscriptions and payments.
 
 from typing import Optional, Dict, Any
 from decimal import Decimal
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status, Query
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -13,7 +14,8 @@ from app.core.auth import get_current_user
 from app.models.contact import Contact
 from app.services.payment_service import PaymentService
 
-router = APIRouter()
+# Payment responses hold only JSON-native values, so orjson encodes them
+router = APIRouter(default_response_class=ORJSONResponse)
 
 
 class SubscriptionRequest(BaseModel):
@@ -44,18 +46,35 @@ class InvoiceRequest(BaseModel):
 
 @router.get("/plans")
 async def get_subscription_plans(
+    if_none_match: Optional[str] = Header(None),
     db: AsyncSession = Depends(get_db),
 ):
     """
     Get available subscription plans.
     
     Returns list of available plans with pricing and features.
+    Supports conditional requests with If-None-Match.
     """
     payment_service = PaymentService(db)
     
-    result = await payment_service.get_subscription_plans()
-    
-    return result
+    etag = payment_service.get_subscription_plans_etag()
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "public, max-age=300, stale-while-revalidate=86400"
+    }
+    
+    if if_none_match and (
+        if_none_match.strip() == "*"
+        or etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    ):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    # The catalog is static, so send the pre-encoded body as is
+    return Response(
+        content=payment_service.get_subscription_plans_json(),
+        media_type="application/json",
+        headers=headers
+    )
 
 
 @router.post("/subscriptions", status_code=status.HTTP_201_CREATED)
@@ -108,7 +127,7 @@ async def cancel_subscription(
     """
     payment_service = PaymentService(db)
     
-    result = await payment_service.cancel_subscription(
+    result = payment_service.cancel_subscription(
         subscription_id=subscription_id,
         reason=request.reason
     )
@@ -160,7 +179,8 @@ async def process_payment(
 @router.get("/payments/history")
 async def get_payment_history(
     limit: int = Query(50, ge=1, le=100),
-    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    offset: int = Query(0, ge=0, deprecated=True, description="Deprecated, use cursor"),
     current_user: Contact = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
@@ -168,15 +188,17 @@ async def get_payment_history(
     Get payment history for current user.
     
     - **limit**: Maximum number of payments to return (1-100)
-    - **offset**: Offset for pagination
+    - **cursor**: next_cursor from the previous page
+    - **offset**: Deprecated offset for pagination, ignored when cursor is set
     
-    Returns list of payments.
+    Returns list of payments and the cursor of the next page.
     """
     payment_service = PaymentService(db)
     
-    result = await payment_service.get_payment_history(
+    result = payment_service.get_payment_history(
         user_id=str(current_user.id),
         limit=limit,
+        cursor=cursor,
         offset=offset
     )
     
@@ -205,7 +227,7 @@ async def generate_invoice(
     """
     payment_service = PaymentService(db)
     
-    result = await payment_service.generate_invoice(
+    result = payment_service.generate_invoice(
         user_id=str(current_user.id),
         payment_id=request.payment_id,
         date_range=request.date_range
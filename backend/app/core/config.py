@@ -31,8 +31,13 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str = Field(..., env="DATABASE_URL")
-    DATABASE_POOL_SIZE: int = 20
+    # Connections-per-core heuristic: enough to keep every core busy while
+    # others wait on I/O, without oversubscribing the server
+    DATABASE_POOL_SIZE: int = (os.cpu_count() or 1) * 2 + 1
     DATABASE_MAX_OVERFLOW: int = 30
+    DATABASE_POOL_RECYCLE: int = 1800
+    DATABASE_STATEMENT_CACHE_SIZE: int = 1024
+    DATABASE_PREPARED_STATEMENT_CACHE_SIZE: int = 256
     DB_POOL_SIZE: int = 20
     DB_MAX_OVERFLOW: int = 30
     DB_POOL_TIMEOUT: int = 30
@@ -67,11 +72,19 @@ class Settings(BaseSettings):
     SENDGRID_FROM_EMAIL: str = Field(default="noreply@verifiedcompliance.com", env="SENDGRID_FROM_EMAIL")
     
     # Firebase Cloud Messaging
+    # Deprecated: legacy server key, unused since notifications moved to the
+    # HTTP v1 API; kept only so existing environments still load
     FCM_SERVER_KEY: Optional[str] = Field(default=None, env="FCM_SERVER_KEY")
+    FCM_PROJECT_ID: Optional[str] = Field(default=None, env="FCM_PROJECT_ID")
+    FCM_SERVICE_ACCOUNT_FILE: Optional[str] = Field(default=None, env="FCM_SERVICE_ACCOUNT_FILE")
+    NOTIFICATION_DISPATCH_INTERVAL: float = Field(default=1.0, env="NOTIFICATION_DISPATCH_INTERVAL")  # seconds, 0 disables
     
     # Monitoring
     SENTRY_DSN: Optional[str] = Field(default=None, env="SENTRY_DSN")
     LOGTAIL_TOKEN: Optional[str] = Field(default=None, env="LOGTAIL_TOKEN")
+    # Off by default: nothing serves the collected snapshot yet, so the
+    # collector would only add database and Redis load in every worker
+    METRICS_COLLECTION_INTERVAL: float = Field(default=0.0, env="METRICS_COLLECTION_INTERVAL")  # seconds, 0 disables
     
     # Logging
     LOG_LEVEL: str = Field(default="INFO", env="LOG_LEVEL")
@@ -9,14 +9,16 @@ import redis.asyncio as redis
 from sqlalchemy import create_engine, event
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
 # Database engine
-def create_engine_with_pool_config():
-    """Create database engine with appropriate pool configuration for the database type"""
+def create_engine_with_pool_config(pooled: bool = True):
+    """Create database engine with appropriate pool configuration for the database type.
+    One-shot scripts can pass pooled=False to connect without a pool."""
     database_url = settings.DATABASE_URL
     if "sqlite" in database_url.lower():
         # SQLite async requires aiosqlite driver
@@ -31,10 +33,28 @@ def create_engine_with_pool_config():
         )
     else:
         # PostgreSQL and other databases support connection pooling
+        connect_args = {}
+        if "asyncpg" in database_url.lower():
+            # asyncpg caches statements per connection; the prepared
+            # statement cache is SQLAlchemy's layer on top of it
+            connect_args = {
+                "statement_cache_size": settings.DATABASE_STATEMENT_CACHE_SIZE,
+                "prepared_statement_cache_size": settings.DATABASE_PREPARED_STATEMENT_CACHE_SIZE,
+            }
+        if not pooled:
+            return create_async_engine(
+                database_url,
+                poolclass=NullPool,
+                connect_args=connect_args,
+                echo=settings.DEBUG,
+            )
         return create_async_engine(
             database_url,
             pool_size=settings.DATABASE_POOL_SIZE,
             max_overflow=settings.DATABASE_MAX_OVERFLOW,
+            pool_pre_ping=True,
+            pool_recycle=settings.DATABASE_POOL_RECYCLE,
+            connect_args=connect_args,
             echo=settings.DEBUG,
         )
 
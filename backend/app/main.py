@@ -20,12 +20,20 @@ from app.core.database import create_tables
 from app.core.exceptions import (
     DatabaseError,
     ExternalServiceError,
+    RateLimitError,
     ValidationError,
     database_error_handler,
     external_service_error_handler,
+    rate_limit_error_handler,
     validation_error_handler,
 )
 from app.core.logging import setup_logging
+from app.services.monitoring_service import monitoring_service
+from app.services.notification_service import (
+    close_http_client,
+    start_scheduled_dispatcher,
+    stop_scheduled_dispatcher,
+)
 
 # Setup logging
 setup_logging()
@@ -41,8 +49,19 @@ async def lifespan(app: FastAPI):
     await create_tables()
     logger.info("Database tables created successfully")
     
+    # Collect system metrics in the background so requests read the latest snapshot
+    if settings.METRICS_COLLECTION_INTERVAL > 0:
+        monitoring_service.start_collector(settings.METRICS_COLLECTION_INTERVAL)
+    
+    # Send scheduled notifications as they fall due
+    if settings.NOTIFICATION_DISPATCH_INTERVAL > 0:
+        start_scheduled_dispatcher(settings.NOTIFICATION_DISPATCH_INTERVAL)
+    
     yield
     
+    await monitoring_service.stop_collector()
+    await stop_scheduled_dispatcher()
+    await close_http_client()
     logger.info("Shutting down Verified Compliance Backend")
 
 
@@ -102,6 +121,7 @@ async def request_validation_exception_handler(request: Request, exc: RequestVal
 app.add_exception_handler(ValidationError, validation_error_handler)
 app.add_exception_handler(DatabaseError, database_error_handler)
 app.add_exception_handler(ExternalServiceError, external_service_error_handler)
+app.add_exception_handler(RateLimitError, rate_limit_error_handler)
 
 # Include API router
 app.include_router(api_router, prefix="/api/v1")
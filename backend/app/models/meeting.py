@@ -6,7 +6,7 @@ import uuid
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import Boolean, Column, DateTime, Float, String, Text, func
+from sqlalchemy import Boolean, Column, DateTime, Float, Index, String, Text, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -17,6 +17,9 @@ class Meeting(Base):
     """Meeting model for meeting locations and information"""
     
     __tablename__ = "meetings"
+    __table_args__ = (
+        Index("ix_meetings_lat_lng", "lat", "lng"),
+    )
     
     # Primary key
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
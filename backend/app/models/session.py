@@ -48,7 +48,12 @@ class Session(Base):
     # Relationships
     contact = relationship("Contact", back_populates="sessions")
     meeting = relationship("Meeting", back_populates="sessions")
-    events = relationship("SessionEvent", back_populates="session", cascade="all, delete-orphan")
+    events = relationship(
+        "SessionEvent",
+        back_populates="session",
+        cascade="all, delete-orphan",
+        order_by="SessionEvent.ts_server"
+    )
     
     def __repr__(self) -> str:
         return f"<Session(id={self.id}, contact_id={self.contact_id}, meeting_id={self.meeting_id}, dest_name={self.dest_name})>"
@@ -0,0 +1,94 @@
+"""
+Minute-bucketed session activity counters kept in Redis
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set
+
+import redis.asyncio as redis
+
+from app.core.database import get_redis
+
+logger = logging.getLogger(__name__)
+
+# A counter write is never worth holding up a session request for
+RECORD_TIMEOUT_SECONDS = 0.5
+
+
+class SessionActivityCounters:
+    """Counts session creations and failures per minute for monitoring.
+    
+    "failed" counts create_session/create_general_session calls that raised,
+    not sessions stored with a failed status as the sessions table scan
+    counts them.
+    """
+    
+    def __init__(self):
+        self.redis_client = None
+        self.key_prefix = "session_activity"
+        self.bucket_ttl_seconds = 2 * 60 * 60
+        self._pending: Set[asyncio.Task] = set()
+    
+    async def _get_redis(self) -> Optional[redis.Redis]:
+        """Get Redis client"""
+        if not self.redis_client:
+            self.redis_client = await get_redis()
+        return self.redis_client
+    
+    def _bucket_key(self, kind: str, moment: datetime) -> str:
+        """Key of the minute bucket containing the given time"""
+        return f"{self.key_prefix}:{kind}:{moment.strftime('%Y%m%d%H%M')}"
+    
+    async def record(self, failed: bool = False) -> None:
+        """Count a session creation attempt in the current minute bucket"""
+        try:
+            redis_client = await self._get_redis()
+            if not redis_client:
+                return
+            
+            now = datetime.utcnow()
+            kinds = ("total", "failed") if failed else ("total",)
+            
+            pipe = redis_client.pipeline(transaction=False)
+            for kind in kinds:
+                key = self._bucket_key(kind, now)
+                pipe.incr(key)
+                pipe.expire(key, self.bucket_ttl_seconds)
+            await asyncio.wait_for(pipe.execute(), RECORD_TIMEOUT_SECONDS)
+            
+        except Exception as e:
+            # Counters are best effort and must never break session handling
+            logger.warning(f"Error recording session activity: {e}")
+    
+    def record_in_background(self, failed: bool = False) -> None:
+        """Count a session creation attempt without waiting on Redis"""
+        task = asyncio.create_task(self.record(failed))
+        # Keep a reference until the task finishes so it is not collected
+        self._pending.add(task)
+        task.add_done_callback(self._record_done)
+    
+    def _record_done(self, task: asyncio.Task) -> None:
+        """Drop a finished background record, logging anything it raised"""
+        self._pending.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Error recording session activity: {task.exception()}")
+    
+    async def get_window(self, minutes: int = 60) -> Optional[Dict[str, List[int]]]:
+        """Get per-minute totals and failures, newest first, in one round trip.
+        Returns None when Redis is unavailable."""
+        redis_client = await self._get_redis()
+        if not redis_client:
+            return None
+        
+        now = datetime.utcnow()
+        moments = [now - timedelta(minutes=offset) for offset in range(minutes)]
+        keys = [self._bucket_key("total", moment) for moment in moments]
+        keys += [self._bucket_key("failed", moment) for moment in moments]
+        
+        values = [int(value or 0) for value in await redis_client.mget(keys)]
+        return {
+            "total": values[:minutes],
+            "failed": values[minutes:]
+        }
@@ -2,8 +2,9 @@
 Location service for GPS verification and geospatial operations
 """
 
+import functools
 import logging
-from typing import Optional, Tuple, List, Dict, Any
+from typing import Optional, Tuple, List, Dict, Any, Callable
 from dataclasses import dataclass
 import math
 
@@ -19,8 +20,19 @@ from app.models.session_event import SessionEvent, EventType
 
 logger = logging.getLogger(__name__)
 
+# Mean Earth radius (IUGG) used by the spherical distance kernels
+EARTH_RADIUS_METERS = 6371008.8
 
-@dataclass
+# Largest relative error of the spherical kernels against the WGS-84
+# geodesic; distances this close to a radius are re-checked geodesically
+SPHERICAL_ERROR_MARGIN = 0.006
+
+# Kernels depend only on the anchor coordinates, so a moved meeting simply
+# misses the cache and stale entries age out
+KERNEL_CACHE_SIZE = 1024
+
+
+@dataclass(slots=True)
 class LocationData:
     """Location data structure"""
     latitude: float
@@ -32,10 +44,11 @@ class LocationData:
     timestamp: Optional[float] = None
     geohash: Optional[str] = None
     
-    def __post_init__(self):
-        """Generate geohash after initialization"""
+    def ensure_geohash(self) -> str:
+        """Return the geohash, encoding it on first use"""
         if self.geohash is None:
             self.geohash = geohash2.encode(self.latitude, self.longitude, precision=12)
+        return self.geohash
 
 
 @dataclass
@@ -48,6 +61,70 @@ class ProximityResult:
     accuracy_confidence: float = 0.0
 
 
+def bounding_box(
+    lat: float,
+    lng: float,
+    radius_meters: float
+) -> Tuple[float, float, Optional[float], Optional[float]]:
+    """Return a lat/lng box enclosing the circle around a point
+    
+    Longitude bounds are None when the box would wrap the antimeridian or
+    reach a pole, in which case only the latitude bounds can be applied.
+    """
+    dlat = math.degrees(radius_meters / EARTH_RADIUS_METERS)
+    min_lat = lat - dlat
+    max_lat = lat + dlat
+    if min_lat <= -90.0 or max_lat >= 90.0:
+        return max(min_lat, -90.0), min(max_lat, 90.0), None, None
+    
+    dlng = math.degrees(
+        math.asin(min(1.0, math.sin(radius_meters / EARTH_RADIUS_METERS) / math.cos(math.radians(lat))))
+    )
+    min_lng = lng - dlng
+    max_lng = lng + dlng
+    if min_lng < -180.0 or max_lng > 180.0:
+        return min_lat, max_lat, None, None
+    
+    return min_lat, max_lat, min_lng, max_lng
+
+
+class MeetingKernel:
+    """Haversine distance kernel specialized to a fixed meeting anchor"""
+    
+    @staticmethod
+    def build(lat_m: float, lng_m: float) -> Callable[[float, float], float]:
+        """Build a distance function with the anchor's trig precomputed
+        
+        The returned callable takes only the user's coordinates and returns
+        the great-circle distance to the anchor in meters.
+        """
+        lat_m_rad = math.radians(lat_m)
+        lng_m_rad = math.radians(lng_m)
+        cos_lat_m = math.cos(lat_m_rad)
+        diameter = 2.0 * EARTH_RADIUS_METERS
+        
+        radians = math.radians
+        sin = math.sin
+        cos = math.cos
+        asin = math.asin
+        sqrt = math.sqrt
+        
+        def distance(user_lat: float, user_lng: float) -> float:
+            lat_rad = radians(user_lat)
+            sin_dlat = sin((lat_rad - lat_m_rad) * 0.5)
+            sin_dlng = sin((radians(user_lng) - lng_m_rad) * 0.5)
+            a = sin_dlat * sin_dlat + cos_lat_m * cos(lat_rad) * sin_dlng * sin_dlng
+            return diameter * asin(sqrt(min(1.0, a)))
+        
+        return distance
+
+
+@functools.lru_cache(maxsize=KERNEL_CACHE_SIZE)
+def meeting_kernel(lat: float, lng: float) -> Callable[[float, float], float]:
+    """Return the shared distance kernel for a meeting anchor"""
+    return MeetingKernel.build(lat, lng)
+
+
 class LocationService:
     """Service for GPS verification and location operations"""
     
@@ -63,15 +140,18 @@ class LocationService:
         user_lng: float,
         meeting_id: str,
         db: AsyncSession,
-        required_accuracy: Optional[float] = None
+        required_accuracy: Optional[float] = None,
+        meeting: Optional[Meeting] = None
     ) -> ProximityResult:
-        """Verify user location against meeting location"""
+        """Verify user location against meeting location. Callers that
+        already hold the meeting can pass it to skip the lookup."""
         try:
             # Get meeting details
-            result = await db.execute(
-                select(Meeting).where(Meeting.id == meeting_id)
-            )
-            meeting = result.scalar_one_or_none()
+            if meeting is None:
+                result = await db.execute(
+                    select(Meeting).where(Meeting.id == meeting_id)
+                )
+                meeting = result.scalar_one_or_none()
             
             if not meeting:
                 return ProximityResult(
@@ -80,10 +160,8 @@ class LocationService:
                     accuracy_confidence=0.0
                 )
             
-            # Calculate distance
-            meeting_coords = (meeting.lat, meeting.lng)
-            user_coords = (user_lat, user_lng)
-            distance = geodesic(meeting_coords, user_coords).meters
+            # Calculate distance using the meeting's spherical kernel
+            distance = meeting_kernel(meeting.lat, meeting.lng)(user_lat, user_lng)
             
             # Determine required radius
             radius = meeting.radius_meters or self.default_radius_meters
@@ -96,6 +174,13 @@ class LocationService:
             else:
                 radius = min(radius, self.max_radius_meters)
             
+            # Near the radius the spherical error could flip the decision,
+            # so settle it with the same geodesic as calculate_distance
+            if abs(distance - radius) <= radius * SPHERICAL_ERROR_MARGIN:
+                distance = self.calculate_distance(
+                    user_lat, user_lng, meeting.lat, meeting.lng
+                )
+            
             # Check if within range
             is_within_range = distance <= radius
             
@@ -181,7 +266,8 @@ class LocationService:
         location_data: LocationData,
         meeting_id: Optional[str] = None,
         notes: Optional[str] = None,
-        db: AsyncSession = None
+        db: AsyncSession = None,
+        meeting: Optional[Meeting] = None
     ) -> Optional[SessionEvent]:
         """Create a session event with location verification"""
         try:
@@ -192,7 +278,8 @@ class LocationService:
                     location_data.longitude,
                     meeting_id,
                     db,
-                    location_data.accuracy
+                    location_data.accuracy,
+                    meeting=meeting
                 )
                 
                 if not proximity_result.is_within_range:
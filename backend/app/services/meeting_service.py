@@ -7,12 +7,14 @@ from datetime import datetime, timedelta
 from typing import List, Optional, Dict, Any
 from uuid import UUID
 
-from sqlalchemy import select, and_, or_, func
+from sqlalchemy import select, update, and_, or_, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.meeting import Meeting
 from app.models.contact import Contact
-from app.services.location_service import LocationService
+from app.services.location_service import (
+    LocationService, MeetingKernel, SPHERICAL_ERROR_MARGIN, bounding_box
+)
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +24,7 @@ class MeetingService:
     
     def __init__(self):
         self.location_service = LocationService()
+        self.scan_tile_size = 4096  # Meetings fetched per tile in radius scans
     
     async def create_meeting(
         self,
@@ -90,45 +93,65 @@ class MeetingService:
             if active_only:
                 conditions.append(Meeting.is_active == True)
             
-            # Get all meetings (or active ones) - we'll filter by distance in Python
+            # Let the database discard everything outside the enclosing box
+            # (served by the lat/lng index) before distances are computed; the
+            # box allows for the spherical error so edge meetings still reach
+            # the geodesic re-check below
+            edge_margin = radius_meters * SPHERICAL_ERROR_MARGIN
+            min_lat, max_lat, min_lng, max_lng = bounding_box(
+                user_lat, user_lng, radius_meters + edge_margin
+            )
+            conditions.append(Meeting.lat.between(min_lat, max_lat))
+            if min_lng is not None:
+                conditions.append(Meeting.lng.between(min_lng, max_lng))
+            
+            # Fetch the candidate meetings - exact distance is filtered in Python
             # This works for SQLite which doesn't have PostGIS
-            query = select(Meeting)
-            if conditions:
-                query = query.where(and_(*conditions))
+            query = select(Meeting).where(and_(*conditions))
+            query = query.execution_options(yield_per=self.scan_tile_size)
             
-            result = await db.execute(query)
-            all_meetings = result.scalars().all()
+            # The user's position is the fixed anchor for the whole scan
+            distance_to_user = MeetingKernel.build(user_lat, user_lng)
             
-            # Calculate distances and filter by radius
+            # Stream meetings in fixed-size tiles and filter each tile by radius,
+            # so only one tile of rows is resident at a time
             nearby_meetings = []
-            for meeting in all_meetings:
-                distance = self.location_service.calculate_distance(
-                    user_lat, user_lng, meeting.lat, meeting.lng
-                )
-                
-                # Filter by radius
-                if distance > radius_meters:
-                    continue
-                
-                # Check if meeting is currently active (within time range)
-                is_currently_active = self._is_meeting_currently_active(meeting)
-                
-                nearby_meetings.append({
-                    "id": str(meeting.id),
-                    "name": meeting.name,
-                    "description": meeting.description,
-                    "address": meeting.address,
-                    "latitude": meeting.lat,
-                    "longitude": meeting.lng,
-                    "radius_meters": meeting.radius_meters,
-                    "distance_meters": round(distance, 2),
-                    "distance_km": round(distance / 1000, 2),
-                    "start_time": meeting.start_time,
-                    "end_time": meeting.end_time,
-                    "is_active": meeting.is_active,
-                    "is_currently_active": is_currently_active,
-                    "created_at": meeting.created_at,
-                })
+            result = await db.stream(query)
+            async for tile in result.scalars().partitions():
+                for meeting in tile:
+                    distance = distance_to_user(meeting.lat, meeting.lng)
+                    
+                    # Near the radius the spherical error could flip the
+                    # decision, so settle it with the same geodesic that
+                    # verify_location uses at check-in
+                    if abs(distance - radius_meters) <= edge_margin:
+                        distance = self.location_service.calculate_distance(
+                            user_lat, user_lng, meeting.lat, meeting.lng
+                        )
+                    
+                    # Filter by radius
+                    if distance > radius_meters:
+                        continue
+                    
+                    # Check if meeting is currently active (within time range)
+                    is_currently_active = self._is_meeting_currently_active(meeting)
+                    
+                    nearby_meetings.append({
+                        "id": str(meeting.id),
+                        "name": meeting.name,
+                        "description": meeting.description,
+                        "address": meeting.address,
+                        "latitude": meeting.lat,
+                        "longitude": meeting.lng,
+                        "radius_meters": meeting.radius_meters,
+                        "distance_meters": round(distance, 2),
+                        "distance_km": round(distance / 1000, 2),
+                        "start_time": meeting.start_time,
+                        "end_time": meeting.end_time,
+                        "is_active": meeting.is_active,
+                        "is_currently_active": is_currently_active,
+                        "created_at": meeting.created_at,
+                    })
             
             # Sort by distance
             nearby_meetings.sort(key=lambda x: x["distance_meters"])
@@ -169,22 +192,28 @@ class MeetingService:
     ) -> Optional[Meeting]:
         """Update meeting information"""
         try:
+            # Only real columns can be written by a bulk UPDATE
+            values = {
+                field: value
+                for field, value in update_data.items()
+                if field in Meeting.__table__.columns and value is not None
+            }
+            values["updated_at"] = datetime.utcnow()
+            
+            # Single UPDATE ... RETURNING instead of SELECT + UPDATE + refresh
             result = await db.execute(
-                select(Meeting).where(Meeting.id == meeting_id)
+                update(Meeting)
+                .where(Meeting.id == str(meeting_id))
+                .values(**values)
+                .returning(Meeting)
+                .execution_options(populate_existing=True)
             )
             meeting = result.scalar_one_or_none()
             
             if not meeting:
                 return None
             
-            # Update fields
-            for field, value in update_data.items():
-                if hasattr(meeting, field) and value is not None:
-                    setattr(meeting, field, value)
-            
-            meeting.updated_at = datetime.utcnow()
             await db.commit()
-            await db.refresh(meeting)
             
             logger.info(f"Updated meeting {meeting_id}")
             return meeting
@@ -202,15 +231,15 @@ class MeetingService:
         """Deactivate a meeting"""
         try:
             result = await db.execute(
-                select(Meeting).where(Meeting.id == meeting_id)
+                update(Meeting)
+                .where(Meeting.id == str(meeting_id))
+                .values(is_active=False, updated_at=datetime.utcnow())
+                .returning(Meeting.id)
             )
-            meeting = result.scalar_one_or_none()
             
-            if not meeting:
+            if result.scalar_one_or_none() is None:
                 return False
             
-            meeting.is_active = False
-            meeting.updated_at = datetime.utcnow()
             await db.commit()
             
             logger.info(f"Deactivated meeting {meeting_id}")
@@ -2,243 +2,445 @@
 Monitoring and logging service
 """
 
+import asyncio
+import functools
 import logging
-import json
+import os
 import time
-from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional
-from uuid import UUID
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Callable, Awaitable, Tuple, Iterator
 
-import httpx
+import orjson
+import psutil
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.database import AsyncSessionLocal
+from app.services.activity_metrics import SessionActivityCounters
 
 logger = logging.getLogger(__name__)
 
+# Score contributed by each health status; anything unlisted scores 0
+STATUS_SCORES = {
+    "healthy": 1.0,
+    "not_configured": 0.5,  # Partial score for not configured
+}
+
+
+# Statements are built once so SQLAlchemy and asyncpg reuse their cached
+# compiled forms and prepared statements on every collection
+PING_QUERY = text("SELECT 1")
+
+DATABASE_STATISTICS_QUERY = text("""
+    WITH size AS (
+        SELECT pg_database_size(current_database()) AS db_size
+    ),
+    tbls AS (
+        SELECT COALESCE(json_agg(t), '[]'::json) AS tables
+        FROM (
+            SELECT 
+                relname AS "table",
+                n_live_tup AS live_tuples,
+                n_dead_tup AS dead_tuples,
+                n_tup_ins AS inserts,
+                n_tup_upd AS updates,
+                n_tup_del AS deletes
+            FROM pg_stat_user_tables
+            ORDER BY n_live_tup DESC
+            LIMIT 50
+        ) t
+    )
+    SELECT size.db_size, tbls.tables
+    FROM size, tbls
+""")
+
+# pg_stat_statements is an optional extension and renamed mean_time to
+# mean_exec_time in PostgreSQL 13, so it is queried separately
+QUERY_STATISTICS_QUERY = text("""
+    SELECT 
+        COUNT(*) AS total_queries,
+        AVG(mean_exec_time) AS avg_time,
+        MAX(mean_exec_time) AS max_time,
+        MIN(mean_exec_time) AS min_time,
+        SUM(calls)::bigint AS total_calls,
+        SUM(total_exec_time) AS total_time
+    FROM pg_stat_statements
+""")
+
+SESSION_ACTIVITY_QUERY = text("""
+    SELECT 
+        COUNT(*) FILTER (WHERE created_at > NOW() - INTERVAL '1 minute') as requests_per_minute,
+        COUNT(*) as total_requests,
+        COUNT(*) FILTER (WHERE status = 'failed') as failed_requests
+    FROM sessions 
+    WHERE created_at > NOW() - INTERVAL '1 hour'
+""")
+
+
+@dataclass(slots=True)
+class Alert:
+    """A threshold breach found by check_alerts"""
+    type: str
+    severity: str
+    value: float
+    threshold: float
+    message_template: str
+    last_seen: datetime = field(default_factory=datetime.utcnow)
+    
+    @property
+    def message(self) -> str:
+        """Human readable alert message, formatted on demand"""
+        return self.message_template.format(value=self.value)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a dictionary for reports"""
+        return {
+            "type": self.type,
+            "severity": self.severity,
+            "message": self.message,
+            "value": self.value,
+            "threshold": self.threshold
+        }
+
+
+def _collector_errors(name: str):
+    """Turn an exception in a metrics collector into an error entry"""
+    def decorator(collector):
+        @functools.wraps(collector)
+        async def wrapper(*args, **kwargs):
+            try:
+                return await collector(*args, **kwargs)
+            except Exception as e:
+                logger.exception("Error collecting %s metrics", name)
+                return {"error": str(e)}
+        return wrapper
+    return decorator
+
+
+def _probe(data: Any, path: Tuple[str, ...]) -> Any:
+    """Follow a key path through nested dicts, returning None if it breaks"""
+    for key in path:
+        if not isinstance(data, dict):
+            return None
+        data = data.get(key)
+        if data is None:
+            return None
+    return data
+
+
+def _connection_percent(metrics: Dict[str, Any]) -> Optional[float]:
+    """Share of the connection pool currently checked out"""
+    pool = _probe(metrics, ("database", "connection_pool"))
+    if pool is None:
+        return None
+    return (pool.get("checked_out", 0) / pool.get("size", 1)) * 100
+
+
+# Alert rules: (type, severity, value getter, threshold key, fires below
+# threshold, message template)
+ALERT_RULES = (
+    (
+        "high_response_time", "warning",
+        lambda m: _probe(m, ("performance", "response_times", "avg_response_time_ms")),
+        "response_time_ms", False,
+        "Average response time {value}ms exceeds threshold"
+    ),
+    (
+        "high_error_rate", "critical",
+        lambda m: _probe(m, ("performance", "error_rates", "error_rate_percent")),
+        "error_rate_percent", False,
+        "Error rate {value}% exceeds threshold"
+    ),
+    (
+        "high_memory_usage", "warning",
+        lambda m: _probe(m, ("application", "memory", "percent")),
+        "memory_usage_percent", False,
+        "Memory usage {value}% exceeds threshold"
+    ),
+    (
+        "high_database_connections", "warning",
+        _connection_percent,
+        "database_connections", False,
+        "Database connections {value}% exceeds threshold"
+    ),
+    (
+        "low_health_score", "critical",
+        lambda m: _probe(m, ("health", "overall_score")),
+        "health_score", True,
+        "Overall health score {value}% is below threshold"
+    ),
+)
+
 
 class MonitoringService:
     """Service for system monitoring and alerting"""
     
-    def __init__(self):
+    def __init__(self, session_factory: Optional[sessionmaker] = None):
+        # AsyncSession is not safe for concurrent use, so every collector
+        # that runs in parallel opens its own session from this factory
+        self.session_factory = session_factory or AsyncSessionLocal
+        self.activity_counters = SessionActivityCounters()
+        # Process handle is reused so cpu_percent() measures between collections
+        self._process = psutil.Process()
+        self._process_pid = self._process.pid
+        self._process_create_time = self._process.create_time()
         self.metrics = {}
-        self.alerts = []
+        # Most recent alerts across reports, bounded for long-running processes
+        self.alerts: deque = deque(maxlen=1000)
+        # Alerts still tripped, by (type, severity), so a rule that stays
+        # tripped refreshes its entry instead of adding one per report
+        self._active_alerts: Dict[Tuple[str, str], Alert] = {}
         self.health_checks = {}
         self.performance_thresholds = {
             "response_time_ms": 1000,
             "error_rate_percent": 5.0,
             "memory_usage_percent": 80.0,
             "cpu_usage_percent": 80.0,
-            "database_connections": 80
+            "database_connections": 80,
+            "health_score": 80
         }
+        # Concurrent callers share one collection, reused for this many seconds
+        self.metrics_cache_ttl = 1.0
+        self._metrics_cache: Optional[Tuple[float, Dict[str, Any]]] = None
+        self._metrics_inflight: Optional[asyncio.Task] = None
+        # Background collector; while it runs callers are served its latest result
+        self._collector_task: Optional[asyncio.Task] = None
     
-    async def collect_system_metrics(self, db: AsyncSession) -> Dict[str, Any]:
+    async def _with_session(
+        self,
+        collector: Callable[[AsyncSession], Awaitable[Any]]
+    ) -> Any:
+        """Run a collector on a dedicated database session"""
+        async with self.session_factory() as db:
+            return await collector(db)
+    
+    async def collect_system_metrics(self) -> Dict[str, Any]:
         """Collect comprehensive system metrics"""
+        cached = self._metrics_cache
+        if cached and (
+            self._collector_task is not None
+            or time.monotonic() - cached[0] < self.metrics_cache_ttl
+        ):
+            return cached[1]
+        
+        return await self._refresh_metrics()
+    
+    async def _refresh_metrics(self) -> Dict[str, Any]:
+        """Run a collection, joining one that is already in flight"""
+        # No await between the check and the assignment, so only one
+        # collection can be started per event loop tick
+        if self._metrics_inflight is None:
+            self._metrics_inflight = asyncio.ensure_future(self._collect_system_metrics())
+        
+        # Shield so a cancelled caller does not cancel the shared collection
+        return await asyncio.shield(self._metrics_inflight)
+    
+    def start_collector(self, interval: float = 5.0) -> None:
+        """Start collecting metrics in the background every interval seconds"""
+        if self._collector_task is None:
+            self._collector_task = asyncio.create_task(self._run_collector(interval))
+            logger.info(f"Metrics collector started (interval {interval}s)")
+    
+    async def stop_collector(self) -> None:
+        """Stop the background metrics collector"""
+        task, self._collector_task = self._collector_task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+            logger.info("Metrics collector stopped")
+    
+    async def _run_collector(self, interval: float) -> None:
+        """Collect metrics on a fixed interval without overlapping runs"""
+        budget = interval * 0.9
+        while True:
+            started = time.monotonic()
+            try:
+                # A collection that overruns keeps going in the background and
+                # is joined by the next tick instead of starting a second one
+                await asyncio.wait_for(self._refresh_metrics(), timeout=budget)
+            except asyncio.TimeoutError:
+                logger.warning(f"Metrics collection took longer than {budget:.1f}s")
+            except Exception as e:
+                logger.error(f"Error in metrics collector: {e}")
+            
+            await asyncio.sleep(max(0.0, interval - (time.monotonic() - started)))
+    
+    async def _collect_system_metrics(self) -> Dict[str, Any]:
+        """Run all collectors and cache the result"""
         try:
-            metrics = {}
-            
-            # Database metrics
-            db_metrics = await self._collect_database_metrics(db)
-            metrics["database"] = db_metrics
-            
-            # Application metrics
-            app_metrics = await self._collect_application_metrics()
-            metrics["application"] = app_metrics
-            
-            # Performance metrics
-            perf_metrics = await self._collect_performance_metrics(db)
-            metrics["performance"] = perf_metrics
+            # Run the independent collectors concurrently
+            results = await asyncio.gather(
+                self._with_session(self._collect_database_metrics),
+                self._collect_application_metrics(),
+                self._with_session(self._collect_performance_metrics),
+                self._with_session(self._collect_health_metrics),
+                return_exceptions=True
+            )
             
-            # Health metrics
-            health_metrics = await self._collect_health_metrics(db)
-            metrics["health"] = health_metrics
+            metrics = {}
+            for name, result in zip(("database", "application", "performance", "health"), results):
+                if isinstance(result, BaseException):
+                    logger.error(f"Error collecting {name} metrics: {result}")
+                    result = {"error": str(result)}
+                metrics[name] = result
             
             # Store metrics
             self.metrics = metrics
+            self._metrics_cache = (time.monotonic(), metrics)
             
-            logger.info("System metrics collected successfully")
+            logger.debug("System metrics collected successfully")
             return metrics
             
         except Exception as e:
             logger.error(f"Error collecting system metrics: {e}")
             return {"error": str(e)}
+        finally:
+            self._metrics_inflight = None
     
+    @_collector_errors("database")
     async def _collect_database_metrics(self, db: AsyncSession) -> Dict[str, Any]:
         """Collect database-specific metrics"""
-        try:
-            metrics = {}
-            
-            # Connection pool stats
-            pool_stats = {
-                "size": db.bind.pool.size(),
-                "checked_in": db.bind.pool.checkedin(),
-                "checked_out": db.bind.pool.checkedout(),
-                "overflow": db.bind.pool.overflow(),
-                "invalid": db.bind.pool.invalid()
-            }
-            metrics["connection_pool"] = pool_stats
-            
-            # Database size
-            size_query = text("SELECT pg_database_size(current_database()) as db_size")
-            result = await db.execute(size_query)
-            db_size = result.fetchone()
-            metrics["database_size_bytes"] = db_size.db_size
-            
-            # Table statistics
-            table_stats = await self._get_table_statistics(db)
-            metrics["tables"] = table_stats
-            
-            # Query performance
-            query_stats = await self._get_query_statistics(db)
-            metrics["queries"] = query_stats
-            
-            return metrics
-            
-        except Exception as e:
-            logger.error(f"Error collecting database metrics: {e}")
-            return {"error": str(e)}
+        metrics = {}
+        
+        # Connection pool stats
+        pool_stats = {
+            "size": db.bind.pool.size(),
+            "checked_in": db.bind.pool.checkedin(),
+            "checked_out": db.bind.pool.checkedout(),
+            "overflow": db.bind.pool.overflow(),
+            "invalid": db.bind.pool.invalid()
+        }
+        metrics["connection_pool"] = pool_stats
+        
+        # Database size, table statistics and query performance
+        database_stats = await self._get_database_statistics(db)
+        metrics.update(database_stats)
+        
+        return metrics
+    
+    def _get_process(self) -> psutil.Process:
+        """Return the cached process handle, refreshing it after a fork"""
+        if os.getpid() != self._process_pid:
+            self._process = psutil.Process()
+            self._process_pid = self._process.pid
+            self._process_create_time = self._process.create_time()
+        return self._process
     
+    @_collector_errors("application")
     async def _collect_application_metrics(self) -> Dict[str, Any]:
         """Collect application-specific metrics"""
-        try:
-            metrics = {}
-            
-            # Memory usage
-            import psutil
-            process = psutil.Process()
+        metrics = {}
+        
+        # Read all process attributes from a single /proc snapshot
+        process = self._get_process()
+        with process.oneshot():
             memory_info = process.memory_info()
-            metrics["memory"] = {
-                "rss": memory_info.rss,
-                "vms": memory_info.vms,
-                "percent": process.memory_percent()
-            }
-            
-            # CPU usage
-            metrics["cpu"] = {
-                "percent": process.cpu_percent(),
-                "num_threads": process.num_threads()
-            }
-            
-            # Process info
-            metrics["process"] = {
-                "pid": process.pid,
-                "create_time": process.create_time(),
-                "status": process.status()
-            }
-            
-            return metrics
-            
-        except Exception as e:
-            logger.error(f"Error collecting application metrics: {e}")
-            return {"error": str(e)}
+            memory_percent = process.memory_percent()
+            cpu_percent = process.cpu_percent()
+            num_threads = process.num_threads()
+            status = process.status()
+        
+        # Memory usage, reported in whole MiB to keep reports compact
+        metrics["memory"] = {
+            "rss_mb": memory_info.rss >> 20,
+            "vms_mb": memory_info.vms >> 20,
+            "percent": round(memory_percent, 2)
+        }
+        
+        # CPU usage
+        metrics["cpu"] = {
+            "percent": round(cpu_percent, 2),
+            "num_threads": num_threads
+        }
+        
+        # Process info
+        metrics["process"] = {
+            "pid": self._process_pid,
+            "create_time": self._process_create_time,
+            "status": status
+        }
+        
+        return metrics
     
+    @_collector_errors("performance")
     async def _collect_performance_metrics(self, db: AsyncSession) -> Dict[str, Any]:
         """Collect performance metrics"""
-        try:
-            metrics = {}
-            
-            # Response time metrics
-            metrics["response_times"] = await self._get_response_time_metrics()
-            
-            # Throughput metrics
-            metrics["throughput"] = await self._get_throughput_metrics(db)
-            
-            # Error rates
-            metrics["error_rates"] = await self._get_error_rate_metrics(db)
-            
-            return metrics
-            
-        except Exception as e:
-            logger.error(f"Error collecting performance metrics: {e}")
-            return {"error": str(e)}
+        metrics = {}
+        
+        # Response time metrics
+        metrics["response_times"] = await self._get_response_time_metrics()
+        
+        # Throughput and error rates share one scan of recent sessions
+        throughput, error_rates = await self._get_session_activity_metrics(db)
+        metrics["throughput"] = throughput
+        metrics["error_rates"] = error_rates
+        
+        return metrics
     
+    @_collector_errors("health")
     async def _collect_health_metrics(self, db: AsyncSession) -> Dict[str, Any]:
         """Collect health check metrics"""
-        try:
-            health = {}
-            
-            # Database connectivity
-            db_health = await self._check_database_health(db)
-            health["database"] = db_health
-            
-            # Redis connectivity
-            redis_health = await self._check_redis_health()
-            health["redis"] = redis_health
-            
-            # External services
-            external_health = await self._check_external_services()
-            health["external"] = external_health
-            
-            # Overall health score
-            health["overall_score"] = self._calculate_health_score(health)
-            
-            return health
-            
-        except Exception as e:
-            logger.error(f"Error collecting health metrics: {e}")
-            return {"error": str(e)}
+        health = {}
+        
+        # Database connectivity
+        db_health = await self._check_database_health(db)
+        health["database"] = db_health
+        
+        # Redis connectivity
+        redis_health = await self._check_redis_health()
+        health["redis"] = redis_health
+        
+        # External services
+        external_health = await self._check_external_services()
+        health["external"] = external_health
+        
+        # Overall health score; every component is known to be present,
+        # so score the check results directly instead of probing the dict
+        health["overall_score"] = self._score_components(
+            [db_health, redis_health], external_health
+        )
+        
+        return health
     
-    async def _get_table_statistics(self, db: AsyncSession) -> Dict[str, Any]:
-        """Get table statistics"""
-        try:
-            query = text("""
-                SELECT 
-                    schemaname,
-                    tablename,
-                    n_live_tup as live_tuples,
-                    n_dead_tup as dead_tuples,
-                    n_tup_ins as inserts,
-                    n_tup_upd as updates,
-                    n_tup_del as deletes
-                FROM pg_stat_user_tables
-                ORDER BY n_live_tup DESC
-            """)
-            
-            result = await db.execute(query)
-            rows = result.fetchall()
-            
-            return {
-                "tables": [
-                    {
-                        "table": row.tablename,
-                        "live_tuples": row.live_tuples,
-                        "dead_tuples": row.dead_tuples,
-                        "inserts": row.inserts,
-                        "updates": row.updates,
-                        "deletes": row.deletes
-                    }
-                    for row in rows
-                ]
-            }
-            
-        except Exception as e:
-            logger.error(f"Error getting table statistics: {e}")
-            return {}
+    async def _get_database_statistics(self, db: AsyncSession) -> Dict[str, Any]:
+        """Get database size and table statistics in one round trip"""
+        result = await db.execute(DATABASE_STATISTICS_QUERY)
+        db_size, tables = result.one()
+        
+        # The table rows arrive as a single server-built JSON array, so no
+        # per-row Row objects are created; asyncpg returns it as text
+        if isinstance(tables, (str, bytes)):
+            tables = orjson.loads(tables)
+        
+        return {
+            "database_size_bytes": db_size,
+            "tables": {"tables": tables},
+            "queries": await self._get_query_statistics(db)
+        }
     
     async def _get_query_statistics(self, db: AsyncSession) -> Dict[str, Any]:
         """Get query performance statistics"""
         try:
-            query = text("""
-                SELECT 
-                    COUNT(*) as total_queries,
-                    AVG(mean_time) as avg_time,
-                    MAX(mean_time) as max_time,
-                    MIN(mean_time) as min_time,
-                    SUM(calls) as total_calls
-                FROM pg_stat_statements
-            """)
-            
-            result = await db.execute(query)
-            row = result.fetchone()
+            # A savepoint keeps a missing extension from aborting the
+            # surrounding transaction
+            async with db.begin_nested():
+                result = await db.execute(QUERY_STATISTICS_QUERY)
+                total_queries, avg_time, max_time, min_time, total_calls, total_time = result.one()
             
             return {
-                "total_queries": row.total_queries,
-                "avg_time_ms": row.avg_time,
-                "max_time_ms": row.max_time,
-                "min_time_ms": row.min_time,
-                "total_calls": row.total_calls
+                "total_queries": total_queries,
+                "avg_time_ms": avg_time,
+                "max_time_ms": max_time,
+                "min_time_ms": min_time,
+                "total_calls": total_calls,
+                "total_time_ms": total_time
             }
             
         except Exception as e:
@@ -261,70 +463,68 @@ class MonitoringService:
             logger.error(f"Error getting response time metrics: {e}")
             return {}
     
-    async def _get_throughput_metrics(self, db: AsyncSession) -> Dict[str, Any]:
-        """Get throughput metrics"""
+    async def _get_session_activity_metrics(
+        self,
+        db: AsyncSession
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Get throughput and error rate metrics for the last hour of sessions"""
         try:
-            # Get requests per minute
-            query = text("""
-                SELECT 
-                    COUNT(*) as requests_per_minute
-                FROM sessions 
-                WHERE created_at > NOW() - INTERVAL '1 minute'
-            """)
-            
-            result = await db.execute(query)
-            row = result.fetchone()
+            # Counters maintained at session creation avoid scanning sessions;
+            # the table is only queried when Redis is unavailable
+            try:
+                window = await self.activity_counters.get_window(60)
+            except Exception as e:
+                logger.warning(f"Session activity counters unavailable: {e}")
+                window = None
+            
+            if window is not None:
+                # Bucket 0 is the minute still in progress, so the rate is
+                # read from the last complete minute
+                requests_per_minute = window["total"][1]
+                total_requests = sum(window["total"])
+                failed_requests = sum(window["failed"])
+            else:
+                requests_per_minute, total_requests, failed_requests = await self._scan_session_activity(db)
             
-            return {
-                "requests_per_minute": row.requests_per_minute,
-                "requests_per_hour": row.requests_per_minute * 60,
-                "requests_per_day": row.requests_per_minute * 60 * 24
+            throughput = {
+                "requests_per_minute": requests_per_minute,
+                "requests_per_hour": requests_per_minute * 60,
+                "requests_per_day": requests_per_minute * 60 * 24
             }
             
-        except Exception as e:
-            logger.error(f"Error getting throughput metrics: {e}")
-            return {}
-    
-    async def _get_error_rate_metrics(self, db: AsyncSession) -> Dict[str, Any]:
-        """Get error rate metrics"""
-        try:
-            # Get error rates from logs or database
-            query = text("""
-                SELECT 
-                    COUNT(*) as total_requests,
-                    COUNT(CASE WHEN status = 'failed' THEN 1 END) as failed_requests
-                FROM sessions 
-                WHERE created_at > NOW() - INTERVAL '1 hour'
-            """)
-            
-            result = await db.execute(query)
-            row = result.fetchone()
-            
-            error_rate = (row.failed_requests / row.total_requests * 100) if row.total_requests > 0 else 0
+            error_rate = (failed_requests / total_requests * 100) if total_requests > 0 else 0
             
-            return {
-                "total_requests": row.total_requests,
-                "failed_requests": row.failed_requests,
+            error_rates = {
+                "total_requests": total_requests,
+                "failed_requests": failed_requests,
                 "error_rate_percent": error_rate
             }
             
+            return throughput, error_rates
+            
         except Exception as e:
-            logger.error(f"Error getting error rate metrics: {e}")
-            return {}
+            logger.error(f"Error getting session activity metrics: {e}")
+            return {}, {}
+    
+    async def _scan_session_activity(self, db: AsyncSession) -> Tuple[int, int, int]:
+        """Count recent sessions from the sessions table in one scan"""
+        result = await db.execute(SESSION_ACTIVITY_QUERY)
+        requests_per_minute, total_requests, failed_requests = result.one()
+        return requests_per_minute, total_requests, failed_requests
     
     async def _check_database_health(self, db: AsyncSession) -> Dict[str, Any]:
         """Check database health"""
         try:
-            start_time = time.time()
+            start_time = time.perf_counter()
             
             # Test database connection
-            await db.execute(text("SELECT 1"))
+            await db.execute(PING_QUERY)
             
-            response_time = (time.time() - start_time) * 1000
+            response_time = (time.perf_counter() - start_time) * 1000
             
             return {
                 "status": "healthy",
-                "response_time_ms": response_time,
+                "response_time_ms": round(response_time, 2),
                 "connection_count": db.bind.pool.checkedout(),
                 "max_connections": db.bind.pool.size()
             }
@@ -357,19 +557,22 @@ class MonitoringService:
     async def _check_external_services(self) -> Dict[str, Any]:
         """Check external services health"""
         try:
-            services = {}
-            
-            # Check GoHighLevel API
-            ghl_health = await self._check_ghl_api()
-            services["go_high_level"] = ghl_health
-            
-            # Check Google Maps API
-            maps_health = await self._check_google_maps_api()
-            services["google_maps"] = maps_health
-            
-            # Check SendGrid API
-            sendgrid_health = await self._check_sendgrid_api()
-            services["sendgrid"] = sendgrid_health
+            # Providers are independent, so check them concurrently
+            ghl_health, maps_health, sendgrid_health = await asyncio.gather(
+                self._check_ghl_api(),
+                self._check_google_maps_api(),
+                self._check_sendgrid_api(),
+                return_exceptions=True
+            )
+            
+            services = {
+                "go_high_level": ghl_health,
+                "google_maps": maps_health,
+                "sendgrid": sendgrid_health
+            }
+            for name, health in services.items():
+                if isinstance(health, Exception):
+                    services[name] = {"status": "unhealthy", "error": str(health)}
             
             return services
             
@@ -433,44 +636,38 @@ class MonitoringService:
     
     def _calculate_health_score(self, health_metrics: Dict[str, Any]) -> float:
         """Calculate overall health score"""
+        components = [
+            health_metrics[component]
+            for component in ("database", "redis")
+            if component in health_metrics
+        ]
+        return self._score_components(components, health_metrics.get("external"))
+    
+    def _score_components(
+        self,
+        components: List[Dict[str, Any]],
+        external_health: Optional[Dict[str, Any]]
+    ) -> float:
+        """Score component health checks plus the averaged external services"""
         try:
-            scores = []
-            
-            # Database health score
-            if "database" in health_metrics:
-                db_health = health_metrics["database"]
-                if db_health.get("status") == "healthy":
-                    scores.append(1.0)
-                else:
-                    scores.append(0.0)
-            
-            # Redis health score
-            if "redis" in health_metrics:
-                redis_health = health_metrics["redis"]
-                if redis_health.get("status") == "healthy":
-                    scores.append(1.0)
-                else:
-                    scores.append(0.0)
+            status_scores = STATUS_SCORES
+            total = 0.0
+            count = len(components)
+            
+            for health in components:
+                total += status_scores.get(health.get("status"), 0.0)
             
             # External services health score
-            if "external" in health_metrics:
-                external_health = health_metrics["external"]
-                service_scores = []
-                for service, health in external_health.items():
-                    if health.get("status") == "healthy":
-                        service_scores.append(1.0)
-                    elif health.get("status") == "not_configured":
-                        service_scores.append(0.5)  # Partial score for not configured
-                    else:
-                        service_scores.append(0.0)
-                
-                if service_scores:
-                    scores.append(sum(service_scores) / len(service_scores))
+            if external_health:
+                service_total = 0.0
+                for health in external_health.values():
+                    service_total += status_scores.get(health.get("status"), 0.0)
+                total += service_total / len(external_health)
+                count += 1
             
             # Calculate overall score
-            if scores:
-                overall_score = sum(scores) / len(scores)
-                return round(overall_score * 100, 2)
+            if count:
+                return round(total / count * 100, 2)
             else:
                 return 0.0
                 
@@ -478,90 +675,47 @@ class MonitoringService:
             logger.error(f"Error calculating health score: {e}")
             return 0.0
     
-    async def check_alerts(self, metrics: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Check for alert conditions"""
+    def check_alerts(self, metrics: Dict[str, Any]) -> Iterator[Alert]:
+        """Check for alert conditions, yielding each alert as it is found"""
         try:
-            alerts = []
-            
-            # Check response time
-            if "performance" in metrics and "response_times" in metrics["performance"]:
-                response_times = metrics["performance"]["response_times"]
-                avg_time = response_times.get("avg_response_time_ms", 0)
-                if avg_time > self.performance_thresholds["response_time_ms"]:
-                    alerts.append({
-                        "type": "high_response_time",
-                        "severity": "warning",
-                        "message": f"Average response time {avg_time}ms exceeds threshold",
-                        "value": avg_time,
-                        "threshold": self.performance_thresholds["response_time_ms"]
-                    })
-            
-            # Check error rate
-            if "performance" in metrics and "error_rates" in metrics["performance"]:
-                error_rates = metrics["performance"]["error_rates"]
-                error_rate = error_rates.get("error_rate_percent", 0)
-                if error_rate > self.performance_thresholds["error_rate_percent"]:
-                    alerts.append({
-                        "type": "high_error_rate",
-                        "severity": "critical",
-                        "message": f"Error rate {error_rate}% exceeds threshold",
-                        "value": error_rate,
-                        "threshold": self.performance_thresholds["error_rate_percent"]
-                    })
-            
-            # Check memory usage
-            if "application" in metrics and "memory" in metrics["application"]:
-                memory = metrics["application"]["memory"]
-                memory_percent = memory.get("percent", 0)
-                if memory_percent > self.performance_thresholds["memory_usage_percent"]:
-                    alerts.append({
-                        "type": "high_memory_usage",
-                        "severity": "warning",
-                        "message": f"Memory usage {memory_percent}% exceeds threshold",
-                        "value": memory_percent,
-                        "threshold": self.performance_thresholds["memory_usage_percent"]
-                    })
-            
-            # Check database connections
-            if "database" in metrics and "connection_pool" in metrics["database"]:
-                pool = metrics["database"]["connection_pool"]
-                checked_out = pool.get("checked_out", 0)
-                pool_size = pool.get("size", 1)
-                connection_percent = (checked_out / pool_size) * 100
-                if connection_percent > self.performance_thresholds["database_connections"]:
-                    alerts.append({
-                        "type": "high_database_connections",
-                        "severity": "warning",
-                        "message": f"Database connections {connection_percent}% exceeds threshold",
-                        "value": connection_percent,
-                        "threshold": self.performance_thresholds["database_connections"]
-                    })
-            
-            # Check health score
-            if "health" in metrics and "overall_score" in metrics["health"]:
-                health_score = metrics["health"]["overall_score"]
-                if health_score < 80:
-                    alerts.append({
-                        "type": "low_health_score",
-                        "severity": "critical",
-                        "message": f"Overall health score {health_score}% is below threshold",
-                        "value": health_score,
-                        "threshold": 80
-                    })
-            
-            self.alerts = alerts
-            return alerts
+            thresholds = self.performance_thresholds
+            
+            for alert_type, severity, get_value, threshold_key, below, message in ALERT_RULES:
+                value = get_value(metrics)
+                if value is None:
+                    continue
+                
+                threshold = thresholds[threshold_key]
+                if (value < threshold) if below else (value > threshold):
+                    yield Alert(alert_type, severity, value, threshold, message)
             
         except Exception as e:
             logger.error(f"Error checking alerts: {e}")
-            return []
     
-    async def send_alert_notification(self, alert: Dict[str, Any]) -> bool:
+    def _record_alerts(self, alerts: List[Alert]) -> None:
+        """Add new alerts to the history and refresh ones already active"""
+        active = {}
+        for alert in alerts:
+            key = (alert.type, alert.severity)
+            existing = self._active_alerts.get(key)
+            if existing is None:
+                self.alerts.append(alert)
+                existing = alert
+            else:
+                existing.value = alert.value
+                existing.threshold = alert.threshold
+                existing.last_seen = alert.last_seen
+            active[key] = existing
+        
+        # Rules that cleared drop out, so tripping again is a new alert
+        self._active_alerts = active
+    
+    async def send_alert_notification(self, alert: Alert) -> bool:
         """Send alert notification"""
         try:
             # This would integrate with notification services
             # For now, just log the alert
-            logger.warning(f"ALERT: {alert['type']} - {alert['message']}")
+            logger.warning(f"ALERT: {alert.type} - {alert.message}")
             
             # In a real implementation, you would:
             # 1. Send email notifications
@@ -575,24 +729,32 @@ class MonitoringService:
             logger.error(f"Error sending alert notification: {e}")
             return False
     
-    async def generate_health_report(self, db: AsyncSession) -> Dict[str, Any]:
+    async def generate_health_report(self) -> Dict[str, Any]:
         """Generate comprehensive health report"""
         try:
             # Collect metrics
-            metrics = await self.collect_system_metrics(db)
+            metrics = await self.collect_system_metrics()
             
             # Check alerts
-            alerts = await self.check_alerts(metrics)
+            alerts = list(self.check_alerts(metrics))
+            self._record_alerts(alerts)
+            
+            critical_alerts = warning_alerts = 0
+            for alert in alerts:
+                if alert.severity == "critical":
+                    critical_alerts += 1
+                elif alert.severity == "warning":
+                    warning_alerts += 1
             
             # Generate report
             report = {
                 "timestamp": datetime.utcnow().isoformat(),
                 "metrics": metrics,
-                "alerts": alerts,
+                "alerts": [alert.to_dict() for alert in alerts],
                 "summary": {
                     "total_alerts": len(alerts),
-                    "critical_alerts": len([a for a in alerts if a.get("severity") == "critical"]),
-                    "warning_alerts": len([a for a in alerts if a.get("severity") == "warning"]),
+                    "critical_alerts": critical_alerts,
+                    "warning_alerts": warning_alerts,
                     "overall_health_score": metrics.get("health", {}).get("overall_score", 0)
                 }
             }
@@ -603,3 +765,15 @@ class MonitoringService:
         except Exception as e:
             logger.error(f"Error generating health report: {e}")
             return {"error": str(e)}
+    
+    async def generate_health_report_bytes(self) -> bytes:
+        """Generate the health report serialized as JSON bytes"""
+        report = await self.generate_health_report()
+        return orjson.dumps(
+            report,
+            option=orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z,
+            default=str
+        )
+
+
+monitoring_service = MonitoringService()
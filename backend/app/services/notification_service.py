@@ -2,83 +2,376 @@
 Push notification service using Firebase Cloud Messaging
 """
 
+import asyncio
+import hashlib
+import json
 import logging
-from datetime import datetime, timedelta
-from typing import Optional, Dict, Any, List
-from uuid import UUID
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Dict, Any, List, Tuple
+from uuid import UUID, uuid4
 
 import httpx
+from jose import jwt
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
+from app.core.database import get_redis
 from app.models.contact import Contact
 from app.models.session import Session
 from app.models.meeting import Meeting
 
 logger = logging.getLogger(__name__)
 
+# Shared by all NotificationService instances so FCM connections (and their
+# TLS sessions) are kept alive and reused across notifications
+_http_client: Optional[httpx.AsyncClient] = None
+
+# Cap on in-flight FCM sends; bursts queue here instead of timing out
+# waiting for a pooled connection
+MAX_CONCURRENT_SENDS = 100
+_send_slots: Optional[asyncio.Semaphore] = None
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    """Get the shared HTTP client, creating it on first use"""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            http2=True,
+            timeout=30.0,
+            limits=httpx.Limits(
+                max_connections=MAX_CONCURRENT_SENDS,
+                max_keepalive_connections=MAX_CONCURRENT_SENDS
+            )
+        )
+    return _http_client
+
+
+async def close_http_client():
+    """Close the shared HTTP client"""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+def _get_send_slots() -> asyncio.Semaphore:
+    """Get the semaphore limiting concurrent FCM sends"""
+    global _send_slots
+    if _send_slots is None:
+        _send_slots = asyncio.Semaphore(MAX_CONCURRENT_SENDS)
+    return _send_slots
+
+
+# Scheduled notifications live in one sorted set scored by due time, so a
+# single dispatcher picks up everything due in one round trip
+SCHEDULED_NOTIFICATIONS_KEY = "scheduled_notifications"
+
+# Failed scheduled sends are rescheduled with exponential backoff and
+# dropped after the last attempt
+SCHEDULED_SEND_ATTEMPTS = 5
+SCHEDULED_RETRY_BASE_DELAY = 30.0  # seconds
+
+# Longest pause between dispatch passes while Redis or FCM is failing
+DISPATCHER_MAX_BACKOFF = 60.0  # seconds
+_dispatcher_task: Optional[asyncio.Task] = None
+
+
+def start_scheduled_dispatcher(interval: float = 1.0):
+    """Start sending due scheduled notifications every interval seconds"""
+    global _dispatcher_task
+    if _dispatcher_task is None:
+        _dispatcher_task = asyncio.create_task(_run_scheduled_dispatcher(interval))
+        logger.info("Scheduled notification dispatcher started (interval %ss)", interval)
+
+
+async def stop_scheduled_dispatcher():
+    """Stop the scheduled notification dispatcher"""
+    global _dispatcher_task
+    task, _dispatcher_task = _dispatcher_task, None
+    if task is not None:
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        logger.info("Scheduled notification dispatcher stopped")
+
+
+async def _run_scheduled_dispatcher(interval: float):
+    """Dispatch due notifications until cancelled"""
+    notification_service = NotificationService()
+    delay = interval
+    failing = False
+    while True:
+        try:
+            await notification_service.dispatch_due_notifications()
+            if failing:
+                logger.info("Scheduled notification dispatcher recovered")
+                failing = False
+            delay = interval
+        except Exception as e:
+            # Log an outage once, then back off instead of retrying every pass
+            if not failing:
+                logger.error("Error in scheduled notification dispatcher: %s", e)
+                failing = True
+            delay = min(delay * 2, DISPATCHER_MAX_BACKOFF)
+        await asyncio.sleep(delay)
+
+
+# FCM responses worth retrying: throttling and transient server errors
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+def _retry_delay(response: httpx.Response, previous_delay: float, base: float, cap: float) -> float:
+    """Delay before retrying a send, honouring Retry-After when FCM provides it"""
+    retry_after = response.headers.get("Retry-After")
+    if retry_after and retry_after.isdigit():
+        return min(cap, float(retry_after))
+    # Decorrelated jitter keeps throttled senders from retrying in lockstep
+    return min(cap, random.uniform(base, previous_delay * 3))
+
+
+_cached_headers: Tuple[Optional[str], Dict[str, str]] = (None, {})
+
+
+def _auth_headers(access_token: str) -> Dict[str, str]:
+    """Request headers for an access token, rebuilt only when the token changes"""
+    global _cached_headers
+    token, headers = _cached_headers
+    if token != access_token:
+        headers = {
+            "Authorization": f"Bearer {access_token}",
+            "Content-Type": "application/json"
+        }
+        _cached_headers = (access_token, headers)
+    return headers
+
+
+FCM_SCOPE = "https://www.googleapis.com/auth/firebase.messaging"
+GOOGLE_TOKEN_URL = "https://oauth2.googleapis.com/token"
+
+# OAuth2 access token for the FCM HTTP v1 API, shared by all instances and
+# refreshed shortly before it expires
+_access_token: Optional[str] = None
+_access_token_expires_at = 0.0
+_access_token_lock: Optional[asyncio.Lock] = None
+
+# Parsed service-account credentials, read once per file path
+_service_accounts: Dict[str, Dict[str, Any]] = {}
+
+
+def _read_service_account(service_account_file: str) -> Dict[str, Any]:
+    """Read and parse a service-account JSON file"""
+    with open(service_account_file) as f:
+        return json.load(f)
+
+
+async def _get_access_token(service_account_file: str) -> str:
+    """Get a cached OAuth2 access token, minting a new one when near expiry"""
+    global _access_token, _access_token_expires_at, _access_token_lock
+    
+    if _access_token and time.time() < _access_token_expires_at - 300:
+        return _access_token
+    
+    if _access_token_lock is None:
+        _access_token_lock = asyncio.Lock()
+    
+    async with _access_token_lock:
+        # Another caller may have refreshed the token while we waited
+        if _access_token and time.time() < _access_token_expires_at - 300:
+            return _access_token
+        
+        # The file is read in a worker thread so disk I/O never blocks the
+        # event loop, and only on the first refresh
+        service_account = _service_accounts.get(service_account_file)
+        if service_account is None:
+            service_account = await asyncio.to_thread(_read_service_account, service_account_file)
+            _service_accounts[service_account_file] = service_account
+        
+        now = int(time.time())
+        assertion = jwt.encode(
+            {
+                "iss": service_account["client_email"],
+                "scope": FCM_SCOPE,
+                "aud": GOOGLE_TOKEN_URL,
+                "iat": now,
+                "exp": now + 3600
+            },
+            service_account["private_key"],
+            algorithm="RS256",
+            headers={"kid": service_account.get("private_key_id")}
+        )
+        
+        response = await _get_http_client().post(
+            GOOGLE_TOKEN_URL,
+            data={
+                "grant_type": "urn:ietf:params:oauth:grant-type:jwt-bearer",
+                "assertion": assertion
+            }
+        )
+        response.raise_for_status()
+        token = response.json()
+        
+        _access_token = token["access_token"]
+        _access_token_expires_at = time.time() + token.get("expires_in", 3600)
+        return _access_token
+
 
 class NotificationService:
     """Service for sending push notifications"""
     
+    # Platform options are the same for every message and never mutated,
+    # so messages share these instead of rebuilding them per send
+    ANDROID_CONFIG = {"notification": {"sound": "default"}}
+    APNS_CONFIG = {"payload": {"aps": {"sound": "default", "badge": 1}}}
+    
     def __init__(self):
-        self.fcm_server_key = settings.FCM_SERVER_KEY
-        self.fcm_url = "https://fcm.googleapis.com/fcm/send"
+        self.project_id = settings.FCM_PROJECT_ID
+        self.service_account_file = settings.FCM_SERVICE_ACCOUNT_FILE
+        self.fcm_url = f"https://fcm.googleapis.com/v1/projects/{self.project_id}/messages:send"
         self.timeout = 30.0
+        self.bulk_chunk_size = 500
+        self.max_send_attempts = 3
+        self.retry_base_delay = 0.5  # seconds
+        self.retry_max_delay = 30.0  # seconds
+        self.sent_key_prefix = "fcm_sent"
+        self.sent_key_ttl = 60 * 60
+        self.dispatch_batch_size = 500
     
-    async def _send_fcm_notification(
+    def _is_configured(self) -> bool:
+        """Check FCM HTTP v1 credentials are configured"""
+        return bool(self.project_id and self.service_account_file)
+    
+    def _build_message(
         self,
         device_token: str,
         title: str,
         body: str,
         data: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Build an FCM HTTP v1 message"""
+        message = {
+            "token": device_token,
+            "notification": {
+                "title": title,
+                "body": body
+            },
+            "android": self.ANDROID_CONFIG,
+            "apns": self.APNS_CONFIG
+        }
+        
+        if data:
+            # HTTP v1 only accepts string data values
+            message["data"] = {key: str(value) for key, value in data.items()}
+        
+        return {"message": message}
+    
+    async def _send_fcm_notification(
+        self,
+        device_token: str,
+        title: str,
+        body: str,
+        data: Optional[Dict[str, Any]] = None,
+        idempotency_key: Optional[str] = None
     ) -> bool:
         """Send FCM notification to device"""
         try:
-            if not self.fcm_server_key:
+            if not self._is_configured():
                 logger.warning("FCM not configured")
                 return False
             
-            headers = {
-                "Authorization": f"key={self.fcm_server_key}",
-                "Content-Type": "application/json"
-            }
+            sent_key = None
+            if idempotency_key:
+                sent_key = await self._claim_send(device_token, idempotency_key)
+                if sent_key is None:
+                    logger.info("Skipping duplicate notification %s to %s", idempotency_key, device_token)
+                    return True
             
-            payload = {
-                "to": device_token,
-                "notification": {
-                    "title": title,
-                    "body": body,
-                    "sound": "default",
-                    "badge": "1"
-                }
-            }
+            sent = await self._post_message(device_token, title, body, data)
+            if not sent and sent_key:
+                # Let a later retry send it again
+                await self._release_send(sent_key)
+            return sent
             
-            if data:
-                payload["data"] = data
+        except Exception as e:
+            logger.error("Error sending FCM notification: %s", e)
+            return False
+    
+    async def _claim_send(self, device_token: str, idempotency_key: str) -> Optional[str]:
+        """Record a send for its idempotency key; returns None if already sent.
+        Without Redis every send is allowed through."""
+        digest = hashlib.sha1(f"{device_token}:{idempotency_key}".encode()).hexdigest()
+        sent_key = f"{self.sent_key_prefix}:{digest}"
+        
+        redis_client = await get_redis()
+        if not redis_client:
+            return sent_key
+        
+        try:
+            claimed = await redis_client.set(sent_key, 1, nx=True, ex=self.sent_key_ttl)
+        except Exception as e:
+            logger.warning("Error checking notification idempotency: %s", e)
+            return sent_key
+        return sent_key if claimed else None
+    
+    async def _release_send(self, sent_key: str):
+        """Forget a send record so the notification can be sent again"""
+        try:
+            redis_client = await get_redis()
+            if redis_client:
+                await redis_client.delete(sent_key)
+        except Exception as e:
+            logger.warning("Error releasing notification idempotency key: %s", e)
+    
+    async def _post_message(
+        self,
+        device_token: str,
+        title: str,
+        body: str,
+        data: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        """Post a message to FCM, retrying throttled and transient failures"""
+        try:
+            payload = self._build_message(device_token, title, body, data)
+            delay = self.retry_base_delay
             
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    self.fcm_url,
-                    headers=headers,
-                    json=payload
-                )
+            for attempt in range(1, self.max_send_attempts + 1):
+                access_token = await _get_access_token(self.service_account_file)
+                headers = _auth_headers(access_token)
+                
+                async with _get_send_slots():
+                    response = await _get_http_client().post(
+                        self.fcm_url,
+                        headers=headers,
+                        json=payload,
+                        timeout=self.timeout
+                    )
                 
                 if response.status_code == 200:
-                    result = response.json()
-                    if result.get("success") == 1:
-                        logger.info(f"FCM notification sent to {device_token}")
-                        return True
-                    else:
-                        logger.error(f"FCM notification failed: {result}")
-                        return False
-                else:
-                    logger.error(f"FCM API error: {response.status_code} - {response.text}")
+                    logger.info("FCM notification sent to %s", device_token)
+                    return True
+                
+                if response.status_code not in RETRYABLE_STATUS_CODES or attempt == self.max_send_attempts:
+                    logger.error("FCM API error: %s - %s", response.status_code, response.text)
                     return False
-                    
+                
+                # Back off outside the send slot so waiting retries do not
+                # hold capacity other sends could use
+                delay = _retry_delay(response, delay, self.retry_base_delay, self.retry_max_delay)
+                logger.warning(
+                    "FCM returned %s, retrying in %.1fs (attempt %s of %s)",
+                    response.status_code, delay, attempt, self.max_send_attempts
+                )
+                await asyncio.sleep(delay)
+            
+            return False
+                
         except Exception as e:
-            logger.error(f"Error sending FCM notification: {e}")
+            logger.error("Error sending FCM notification: %s", e)
             return False
     
     async def send_meeting_reminder(
@@ -86,7 +379,8 @@ class NotificationService:
         contact: Contact,
         meeting: Meeting,
         device_token: str,
-        hours_before: int = 24
+        hours_before: int = 24,
+        idempotency_key: Optional[str] = None
     ) -> bool:
         """Send meeting reminder notification"""
         try:
@@ -104,11 +398,12 @@ class NotificationService:
                 device_token=device_token,
                 title=title,
                 body=body,
-                data=data
+                data=data,
+                idempotency_key=idempotency_key
             )
             
         except Exception as e:
-            logger.error(f"Error sending meeting reminder: {e}")
+            logger.error("Error sending meeting reminder: %s", e)
             return False
     
     async def send_check_in_reminder(
@@ -116,7 +411,8 @@ class NotificationService:
         contact: Contact,
         session: Session,
         meeting: Meeting,
-        device_token: str
+        device_token: str,
+        idempotency_key: Optional[str] = None
     ) -> bool:
         """Send check-in reminder notification"""
         try:
@@ -134,11 +430,12 @@ class NotificationService:
                 device_token=device_token,
                 title=title,
                 body=body,
-                data=data
+                data=data,
+                idempotency_key=idempotency_key
             )
             
         except Exception as e:
-            logger.error(f"Error sending check-in reminder: {e}")
+            logger.error("Error sending check-in reminder: %s", e)
             return False
     
     async def send_check_out_reminder(
@@ -146,7 +443,8 @@ class NotificationService:
         contact: Contact,
         session: Session,
         meeting: Meeting,
-        device_token: str
+        device_token: str,
+        idempotency_key: Optional[str] = None
     ) -> bool:
         """Send check-out reminder notification"""
         try:
@@ -164,11 +462,12 @@ class NotificationService:
                 device_token=device_token,
                 title=title,
                 body=body,
-                data=data
+                data=data,
+                idempotency_key=idempotency_key
             )
             
         except Exception as e:
-            logger.error(f"Error sending check-out reminder: {e}")
+            logger.error("Error sending check-out reminder: %s", e)
             return False
     
     async def send_attendance_confirmation(
@@ -176,7 +475,8 @@ class NotificationService:
         contact: Contact,
         session: Session,
         meeting: Meeting,
-        device_token: str
+        device_token: str,
+        idempotency_key: Optional[str] = None
     ) -> bool:
         """Send attendance confirmation notification"""
         try:
@@ -194,11 +494,12 @@ class NotificationService:
                 device_token=device_token,
                 title=title,
                 body=body,
-                data=data
+                data=data,
+                idempotency_key=idempotency_key
             )
             
         except Exception as e:
-            logger.error(f"Error sending attendance confirmation: {e}")
+            logger.error("Error sending attendance confirmation: %s", e)
             return False
     
     async def send_location_verification_failed(
@@ -207,7 +508,8 @@ class NotificationService:
         session: Session,
         meeting: Meeting,
         device_token: str,
-        reason: str
+        reason: str,
+        idempotency_key: Optional[str] = None
     ) -> bool:
         """Send location verification failed notification"""
         try:
@@ -226,18 +528,20 @@ class NotificationService:
                 device_token=device_token,
                 title=title,
                 body=body,
-                data=data
+                data=data,
+                idempotency_key=idempotency_key
             )
             
         except Exception as e:
-            logger.error(f"Error sending location verification failed: {e}")
+            logger.error("Error sending location verification failed: %s", e)
             return False
     
     async def send_offline_sync_notification(
         self,
         contact: Contact,
         device_token: str,
-        operation_count: int
+        operation_count: int,
+        idempotency_key: Optional[str] = None
     ) -> bool:
         """Send offline sync notification"""
         try:
@@ -253,11 +557,12 @@ class NotificationService:
                 device_token=device_token,
                 title=title,
                 body=body,
-                data=data
+                data=data,
+                idempotency_key=idempotency_key
             )
             
         except Exception as e:
-            logger.error(f"Error sending offline sync notification: {e}")
+            logger.error("Error sending offline sync notification: %s", e)
             return False
     
     async def send_general_notification(
@@ -266,7 +571,8 @@ class NotificationService:
         device_token: str,
         title: str,
         body: str,
-        notification_type: str = "general"
+        notification_type: str = "general",
+        idempotency_key: Optional[str] = None
     ) -> bool:
         """Send general notification"""
         try:
@@ -278,11 +584,12 @@ class NotificationService:
                 device_token=device_token,
                 title=title,
                 body=body,
-                data=data
+                data=data,
+                idempotency_key=idempotency_key
             )
             
         except Exception as e:
-            logger.error(f"Error sending general notification: {e}")
+            logger.error("Error sending general notification: %s", e)
             return False
     
     async def send_bulk_notification(
@@ -294,48 +601,28 @@ class NotificationService:
     ) -> Dict[str, int]:
         """Send notification to multiple devices"""
         try:
-            if not self.fcm_server_key:
+            if not self._is_configured():
                 logger.warning("FCM not configured")
                 return {"success": 0, "failed": len(device_tokens)}
             
-            headers = {
-                "Authorization": f"key={self.fcm_server_key}",
-                "Content-Type": "application/json"
-            }
+            # HTTP v1 addresses one device per message; the sends share the
+            # pooled HTTP/2 client and a single cached access token. Tokens
+            # are sent in chunks so large audiences do not spawn a task each
+            success_count = 0
+            for start in range(0, len(device_tokens), self.bulk_chunk_size):
+                chunk = device_tokens[start:start + self.bulk_chunk_size]
+                results = await asyncio.gather(*(
+                    self._send_fcm_notification(device_token, title, body, data)
+                    for device_token in chunk
+                ))
+                success_count += sum(results)
+            failure_count = len(device_tokens) - success_count
             
-            payload = {
-                "registration_ids": device_tokens,
-                "notification": {
-                    "title": title,
-                    "body": body,
-                    "sound": "default",
-                    "badge": "1"
-                }
-            }
-            
-            if data:
-                payload["data"] = data
+            logger.info("Bulk notification sent: %s success, %s failed", success_count, failure_count)
+            return {"success": success_count, "failed": failure_count}
             
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    self.fcm_url,
-                    headers=headers,
-                    json=payload
-                )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    success_count = result.get("success", 0)
-                    failure_count = result.get("failure", 0)
-                    
-                    logger.info(f"Bulk notification sent: {success_count} success, {failure_count} failed")
-                    return {"success": success_count, "failed": failure_count}
-                else:
-                    logger.error(f"FCM bulk API error: {response.status_code} - {response.text}")
-                    return {"success": 0, "failed": len(device_tokens)}
-                    
         except Exception as e:
-            logger.error(f"Error sending bulk notification: {e}")
+            logger.error("Error sending bulk notification: %s", e)
             return {"success": 0, "failed": len(device_tokens)}
     
     async def schedule_notification(
@@ -347,17 +634,99 @@ class NotificationService:
     ) -> bool:
         """Schedule a notification for a specific time"""
         try:
-            # This would typically use a job queue like Celery or RQ
-            # For now, we'll just log the scheduled notification
-            logger.info(f"Scheduled notification for {contact.email} at {notification_time}")
+            redis_client = await get_redis()
+            if not redis_client:
+                logger.warning("Redis unavailable, cannot schedule notification")
+                return False
+            
+            # Naive times are UTC throughout the app
+            if notification_time.tzinfo is None:
+                notification_time = notification_time.replace(tzinfo=timezone.utc)
+            
+            hours_before = 0
+            if meeting.start_time:
+                seconds_before = (meeting.start_time - notification_time).total_seconds()
+                hours_before = max(0, round(seconds_before / 3600))
+            
+            notification = {
+                # Doubles as the idempotency key so a notification is sent once
+                "id": str(uuid4()),
+                "device_token": device_token,
+                "title": f"Meeting Reminder - {meeting.name}",
+                "body": f"Your meeting starts in {hours_before} hours at {meeting.address}",
+                "data": {
+                    "type": "meeting_reminder",
+                    "meeting_id": str(meeting.id),
+                    "meeting_name": meeting.name,
+                    "hours_before": hours_before
+                }
+            }
             
-            # In a real implementation, you would:
-            # 1. Store the notification in a database
-            # 2. Use a job scheduler to send it at the specified time
-            # 3. Handle timezone conversions properly
+            await redis_client.zadd(
+                SCHEDULED_NOTIFICATIONS_KEY,
+                {json.dumps(notification): notification_time.timestamp()}
+            )
             
+            logger.info("Scheduled notification for %s at %s", contact.email, notification_time)
             return True
             
         except Exception as e:
-            logger.error(f"Error scheduling notification: {e}")
+            logger.error("Error scheduling notification: %s", e)
             return False
+    
+    async def dispatch_due_notifications(self) -> int:
+        """Send scheduled notifications that are due; returns the number sent"""
+        redis_client = await get_redis()
+        if not redis_client:
+            return 0
+        
+        due = await redis_client.zrangebyscore(
+            SCHEDULED_NOTIFICATIONS_KEY, "-inf", time.time(),
+            start=0, num=self.dispatch_batch_size
+        )
+        if not due:
+            return 0
+        
+        # Only members this dispatcher removed are sent, so concurrent
+        # dispatchers never pick up the same notification
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for member in due:
+                pipe.zrem(SCHEDULED_NOTIFICATIONS_KEY, member)
+            removed = await pipe.execute()
+        
+        notifications = [json.loads(member) for member, claimed in zip(due, removed) if claimed]
+        results = await asyncio.gather(*(
+            self._send_fcm_notification(
+                notification["device_token"],
+                notification["title"],
+                notification["body"],
+                notification["data"],
+                idempotency_key=notification["id"]
+            )
+            for notification in notifications
+        ))
+        
+        failed = [n for n, sent in zip(notifications, results) if not sent]
+        if failed:
+            await self._reschedule_failed(redis_client, failed)
+        return sum(results)
+    
+    async def _reschedule_failed(self, redis_client, notifications: List[Dict[str, Any]]):
+        """Put failed scheduled notifications back with exponential backoff"""
+        retries = {}
+        for notification in notifications:
+            attempts = notification.get("attempts", 0) + 1
+            if attempts >= SCHEDULED_SEND_ATTEMPTS:
+                logger.error(
+                    "Dropping scheduled notification %s after %s attempts",
+                    notification["id"], attempts
+                )
+                continue
+            
+            notification["attempts"] = attempts
+            retry_at = time.time() + SCHEDULED_RETRY_BASE_DELAY * 2 ** (attempts - 1)
+            retries[json.dumps(notification)] = retry_at
+        
+        if retries:
+            await redis_client.zadd(SCHEDULED_NOTIFICATIONS_KEY, retries)
+            logger.warning("Rescheduled %s failed notifications", len(retries))
@@ -2,12 +2,14 @@
 Offline service for queue-based operations when network is unavailable
 """
 
-import json
 import logging
+import random
+import time
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
 from uuid import UUID, uuid4
 
+import orjson
 import redis.asyncio as redis
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -19,10 +21,84 @@ from app.services.session_service import SessionService
 
 logger = logging.getLogger(__name__)
 
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _to_epoch(value: Optional[datetime]) -> Optional[float]:
+    """Naive UTC datetime as epoch seconds for storage"""
+    return (value - _EPOCH).total_seconds() if value else None
+
+
+def _epoch_seconds(value: Any) -> float:
+    """Stored timestamp as epoch seconds; members written before timestamps
+    were stored as numbers hold ISO strings"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    return (datetime.fromisoformat(value) - _EPOCH).total_seconds()
+
+
+def _from_epoch(value: Any) -> Optional[datetime]:
+    """Stored timestamp as a naive UTC datetime"""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return _EPOCH + timedelta(seconds=value)
+    return datetime.fromisoformat(value)
+
+
+def _queue_score(priority: int, created_seconds: int) -> int:
+    """Queue ordering score: higher priority first, then oldest first"""
+    return priority * 1000000 - created_seconds
+
+# Atomically claims the highest priority operations that are due, parking
+# them in the in-flight set with a claim deadline so concurrent workers
+# never receive the same operation. Operations backing off after a failed
+# attempt are also held in a due-time set until their retry time passes;
+# they stay in the queue, untouched, while they wait.
+CLAIM_OPERATIONS_SCRIPT = """
+redis.call('ZREMRANGEBYSCORE', KEYS[3], '-inf', ARGV[3])
+local wanted = tonumber(ARGV[1]) * 2
+local claimed = {}
+local offset = 0
+while #claimed < wanted do
+    local items = redis.call('ZREVRANGE', KEYS[1], offset, offset + 99, 'WITHSCORES')
+    if #items == 0 then
+        break
+    end
+    for i = 1, #items, 2 do
+        if #claimed < wanted and not redis.call('ZSCORE', KEYS[3], items[i]) then
+            claimed[#claimed + 1] = items[i]
+            claimed[#claimed + 1] = items[i + 1]
+        end
+    end
+    offset = offset + 100
+end
+for i = 1, #claimed, 2 do
+    redis.call('ZREM', KEYS[1], claimed[i])
+    redis.call('ZADD', KEYS[2], ARGV[2], claimed[i])
+end
+return claimed
+"""
+
 
 class OfflineOperation:
     """Represents an offline operation to be queued"""
     
+    __slots__ = (
+        "id",
+        "operation_type",
+        "data",
+        "user_id",
+        "priority",
+        "max_retries",
+        "retry_count",
+        "_created_ns",
+        "last_attempt",
+        "next_attempt",
+        "status",
+        "stored_json",
+    )
+    
     def __init__(
         self,
         operation_type: str,
@@ -38,9 +114,20 @@ class OfflineOperation:
         self.priority = priority
         self.max_retries = max_retries
         self.retry_count = 0
-        self.created_at = datetime.utcnow()
+        self._created_ns = time.time_ns()
         self.last_attempt = None
+        self.next_attempt = None
         self.status = "pending"  # pending, processing, failed, completed
+        self.stored_json: Optional[str] = None  # Queue member this was read from
+    
+    @property
+    def created_at(self) -> datetime:
+        """Creation time as a naive UTC datetime, built only when needed"""
+        return _EPOCH + timedelta(microseconds=self._created_ns // 1000)
+    
+    @created_at.setter
+    def created_at(self, value: datetime):
+        self._created_ns = (value - _EPOCH) // timedelta(microseconds=1) * 1000
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for storage"""
@@ -52,29 +139,40 @@ class OfflineOperation:
             "priority": self.priority,
             "max_retries": self.max_retries,
             "retry_count": self.retry_count,
-            "created_at": self.created_at.isoformat(),
-            "last_attempt": self.last_attempt.isoformat() if self.last_attempt else None,
+            "created_at": self._created_ns / 1e9,
+            "last_attempt": _to_epoch(self.last_attempt),
+            "next_attempt": _to_epoch(self.next_attempt),
             "status": self.status
         }
     
+    def queue_score(self) -> int:
+        """Queue ordering score: higher priority first, then oldest first"""
+        return _queue_score(self.priority, self._created_ns // 1000000000)
+    
+    def to_json(self) -> str:
+        """Serialize for storage as a queue member"""
+        # Timestamps in to_dict are epoch seconds, so reading a queue does
+        # not parse ISO strings
+        return orjson.dumps(self.to_dict()).decode()
+    
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "OfflineOperation":
         """Create from dictionary"""
-        operation = cls(
-            operation_type=data["operation_type"],
-            data=data["data"],
-            user_id=UUID(data["user_id"]),
-            priority=data.get("priority", 1),
-            max_retries=data.get("max_retries", 3)
-        )
+        # Every slot comes from the stored data, so __init__ is skipped
+        # rather than generating an id and timestamp only to overwrite them
+        operation = cls.__new__(cls)
         operation.id = data["id"]
+        operation.operation_type = data["operation_type"]
+        operation.data = data["data"]
+        operation.user_id = UUID(data["user_id"])
+        operation.priority = data.get("priority", 1)
+        operation.max_retries = data.get("max_retries", 3)
         operation.retry_count = data.get("retry_count", 0)
-        operation.created_at = datetime.fromisoformat(data["created_at"])
-        operation.last_attempt = (
-            datetime.fromisoformat(data["last_attempt"])
-            if data.get("last_attempt") else None
-        )
+        operation._created_ns = round(_epoch_seconds(data["created_at"]) * 1e6) * 1000
+        operation.last_attempt = _from_epoch(data.get("last_attempt"))
+        operation.next_attempt = _from_epoch(data.get("next_attempt"))
         operation.status = data.get("status", "pending")
+        operation.stored_json = None
         return operation
 
 
@@ -86,6 +184,11 @@ class OfflineService:
         self.session_service = SessionService()
         self.queue_key_prefix = "offline_queue"
         self.failed_key_prefix = "offline_failed"
+        self.failed_index_key_prefix = "offline_failed_idx"
+        self.failed_ttl_seconds = 30 * 24 * 60 * 60
+        self.inflight_key_prefix = "offline_inflight"
+        self.due_key_prefix = "offline_due"
+        self.claim_timeout_seconds = 5 * 60
         self.max_queue_size = 1000
         self.retry_delay_minutes = 5
     
@@ -95,6 +198,11 @@ class OfflineService:
             self.redis_client = await get_redis()
         return self.redis_client
     
+    def _next_attempt_time(self, operation: OfflineOperation) -> datetime:
+        """When a failed operation may be retried: exponential backoff with jitter"""
+        base_seconds = self.retry_delay_minutes * 60 * 2 ** (operation.retry_count - 1)
+        return datetime.utcnow() + timedelta(seconds=base_seconds * (1 + random.random()))
+    
     async def queue_operation(
         self,
         operation_type: str,
@@ -116,20 +224,22 @@ class OfflineService:
             
             # Store in Redis queue
             queue_key = f"{self.queue_key_prefix}:{user_id}"
-            operation_json = json.dumps(operation.to_dict())
+            operation_json = operation.to_json()
             
             # Use priority score for ordering
-            score = operation.priority * 1000000 - int(operation.created_at.timestamp())
-            await redis_client.zadd(queue_key, {operation_json: score})
+            score = operation.queue_score()
             
-            # Set expiration for queue (7 days)
-            await redis_client.expire(queue_key, 7 * 24 * 60 * 60)
+            # Enqueue and refresh the queue expiration (7 days) in one round trip
+            async with redis_client.pipeline(transaction=False) as pipe:
+                pipe.zadd(queue_key, {operation_json: score})
+                pipe.expire(queue_key, 7 * 24 * 60 * 60)
+                await pipe.execute()
             
-            logger.info(f"Queued operation {operation.id} for user {user_id}")
+            logger.info("Queued operation %s for user %s", operation.id, user_id)
             return operation.id
             
         except Exception as e:
-            logger.error(f"Error queueing operation: {e}")
+            logger.error("Error queueing operation: %s", e)
             raise
     
     async def get_pending_operations(
@@ -150,19 +260,76 @@ class OfflineService:
             operations = []
             for operation_json, score in operations_data:
                 try:
-                    operation_dict = json.loads(operation_json)
+                    operation_dict = orjson.loads(operation_json)
                     operation = OfflineOperation.from_dict(operation_dict)
+                    operation.stored_json = operation_json
                     operations.append(operation)
                 except Exception as e:
-                    logger.warning(f"Error parsing operation: {e}")
+                    logger.warning("Error parsing operation: %s", e)
                     continue
             
             return operations
             
         except Exception as e:
-            logger.error(f"Error getting pending operations: {e}")
+            logger.error("Error getting pending operations: %s", e)
             return []
     
+    async def claim_operations(
+        self,
+        user_id: UUID,
+        limit: int = 50
+    ) -> List[OfflineOperation]:
+        """Claim due operations for processing so no other worker receives them"""
+        redis_client = await self._get_redis()
+        queue_key = f"{self.queue_key_prefix}:{user_id}"
+        inflight_key = f"{self.inflight_key_prefix}:{user_id}"
+        
+        due_key = f"{self.due_key_prefix}:{user_id}"
+        
+        now = time.time()
+        claimed = await redis_client.eval(
+            CLAIM_OPERATIONS_SCRIPT, 3, queue_key, inflight_key, due_key,
+            limit, now + self.claim_timeout_seconds, now
+        )
+        
+        operations = []
+        for operation_json in claimed[::2]:
+            try:
+                operation = OfflineOperation.from_dict(orjson.loads(operation_json))
+            except Exception as e:
+                logger.warning("Error parsing operation: %s", e)
+                continue
+            
+            operation.stored_json = operation_json
+            operations.append(operation)
+        
+        return operations
+    
+    async def requeue_expired_operations(self, user_id: UUID) -> int:
+        """Return claimed operations whose worker missed its deadline to the queue"""
+        try:
+            redis_client = await self._get_redis()
+            queue_key = f"{self.queue_key_prefix}:{user_id}"
+            inflight_key = f"{self.inflight_key_prefix}:{user_id}"
+            
+            expired = await redis_client.zrangebyscore(inflight_key, "-inf", time.time())
+            if not expired:
+                return 0
+            
+            async with redis_client.pipeline(transaction=True) as pipe:
+                for operation_json in expired:
+                    operation = OfflineOperation.from_dict(orjson.loads(operation_json))
+                    pipe.zadd(queue_key, {operation_json: operation.queue_score()})
+                pipe.zrem(inflight_key, *expired)
+                await pipe.execute()
+            
+            logger.warning("Requeued %s expired operations for user %s", len(expired), user_id)
+            return len(expired)
+            
+        except Exception as e:
+            logger.error("Error requeueing expired operations: %s", e)
+            return 0
+    
     async def process_operation(
         self,
         operation: OfflineOperation,
@@ -184,30 +351,32 @@ class OfflineService:
             elif operation.operation_type == "end_session":
                 success = await self._process_end_session(operation, db)
             else:
-                logger.warning(f"Unknown operation type: {operation.operation_type}")
+                logger.warning("Unknown operation type: %s", operation.operation_type)
                 return False
             
             if success:
                 operation.status = "completed"
                 await self._remove_operation(operation)
-                logger.info(f"Successfully processed operation {operation.id}")
+                logger.info("Successfully processed operation %s", operation.id)
             else:
                 operation.retry_count += 1
                 if operation.retry_count >= operation.max_retries:
                     operation.status = "failed"
                     await self._move_to_failed(operation)
-                    logger.error(f"Operation {operation.id} failed after {operation.max_retries} retries")
+                    logger.error("Operation %s failed after %s retries", operation.id, operation.max_retries)
                 else:
                     operation.status = "pending"
+                    operation.next_attempt = self._next_attempt_time(operation)
                     await self._update_operation(operation)
-                    logger.warning(f"Operation {operation.id} failed, will retry (attempt {operation.retry_count})")
+                    logger.warning("Operation %s failed, will retry (attempt %s)", operation.id, operation.retry_count)
             
             return success
             
         except Exception as e:
-            logger.error(f"Error processing operation {operation.id}: {e}")
+            logger.error("Error processing operation %s: %s", operation.id, e)
             operation.retry_count += 1
             operation.status = "failed" if operation.retry_count >= operation.max_retries else "pending"
+            operation.next_attempt = self._next_attempt_time(operation)
             await self._update_operation(operation)
             return False
     
@@ -219,7 +388,8 @@ class OfflineService:
     ) -> Dict[str, int]:
         """Process all pending operations for a user"""
         try:
-            operations = await self.get_pending_operations(user_id, max_operations)
+            await self.requeue_expired_operations(user_id)
+            operations = await self.claim_operations(user_id, max_operations)
             
             processed = 0
             failed = 0
@@ -238,7 +408,7 @@ class OfflineService:
             }
             
         except Exception as e:
-            logger.error(f"Error processing user queue for {user_id}: {e}")
+            logger.error("Error processing user queue for %s: %s", user_id, e)
             return {"processed": 0, "failed": 0, "total": 0}
     
     async def _process_check_in(
@@ -269,7 +439,7 @@ class OfflineService:
             return event is not None
             
         except Exception as e:
-            logger.error(f"Error processing check-in: {e}")
+            logger.error("Error processing check-in: %s", e)
             return False
     
     async def _process_check_out(
@@ -300,7 +470,7 @@ class OfflineService:
             return event is not None
             
         except Exception as e:
-            logger.error(f"Error processing check-out: {e}")
+            logger.error("Error processing check-out: %s", e)
             return False
     
     async def _process_create_session(
@@ -321,7 +491,7 @@ class OfflineService:
             return session is not None
             
         except Exception as e:
-            logger.error(f"Error processing create session: {e}")
+            logger.error("Error processing create session: %s", e)
             return False
     
     async def _process_end_session(
@@ -341,50 +511,89 @@ class OfflineService:
             return success
             
         except Exception as e:
-            logger.error(f"Error processing end session: {e}")
+            logger.error("Error processing end session: %s", e)
             return False
     
     async def _remove_operation(self, operation: OfflineOperation):
         """Remove operation from queue"""
         try:
+            if operation.stored_json is None:
+                return
+            
             redis_client = await self._get_redis()
             queue_key = f"{self.queue_key_prefix}:{operation.user_id}"
+            inflight_key = f"{self.inflight_key_prefix}:{operation.user_id}"
+            due_key = f"{self.due_key_prefix}:{operation.user_id}"
             
-            # Remove from queue
-            await redis_client.zremrangebyscore(queue_key, "-inf", "+inf")
+            # Remove only this operation's member, wherever it currently is
+            async with redis_client.pipeline(transaction=True) as pipe:
+                pipe.zrem(queue_key, operation.stored_json)
+                pipe.zrem(inflight_key, operation.stored_json)
+                pipe.zrem(due_key, operation.stored_json)
+                await pipe.execute()
+            operation.stored_json = None
             
         except Exception as e:
-            logger.error(f"Error removing operation: {e}")
+            logger.error("Error removing operation: %s", e)
     
     async def _move_to_failed(self, operation: OfflineOperation):
         """Move operation to failed queue"""
         try:
             redis_client = await self._get_redis()
+            queue_key = f"{self.queue_key_prefix}:{operation.user_id}"
+            inflight_key = f"{self.inflight_key_prefix}:{operation.user_id}"
+            due_key = f"{self.due_key_prefix}:{operation.user_id}"
             failed_key = f"{self.failed_key_prefix}:{operation.user_id}"
+            index_key = f"{self.failed_index_key_prefix}:{operation.user_id}"
+            
+            operation_json = operation.to_json()
             
-            operation_json = json.dumps(operation.to_dict())
-            await redis_client.lpush(failed_key, operation_json)
+            async with redis_client.pipeline(transaction=True) as pipe:
+                if operation.stored_json is not None:
+                    pipe.zrem(queue_key, operation.stored_json)
+                    pipe.zrem(inflight_key, operation.stored_json)
+                    pipe.zrem(due_key, operation.stored_json)
+                pipe.lpush(failed_key, operation_json)
+                # Index by id so retries don't have to scan the list
+                pipe.hset(index_key, operation.id, operation_json)
+                # Set expiration for failed queue (30 days)
+                pipe.expire(failed_key, self.failed_ttl_seconds)
+                pipe.expire(index_key, self.failed_ttl_seconds)
+                await pipe.execute()
             
-            # Set expiration for failed queue (30 days)
-            await redis_client.expire(failed_key, 30 * 24 * 60 * 60)
+            operation.stored_json = None
             
         except Exception as e:
-            logger.error(f"Error moving operation to failed: {e}")
+            logger.error("Error moving operation to failed: %s", e)
     
     async def _update_operation(self, operation: OfflineOperation):
         """Update operation in queue"""
         try:
             redis_client = await self._get_redis()
             queue_key = f"{self.queue_key_prefix}:{operation.user_id}"
-            
-            operation_json = json.dumps(operation.to_dict())
-            score = operation.priority * 1000000 - int(operation.created_at.timestamp())
-            
-            # Update in queue
-            await redis_client.zadd(queue_key, {operation_json: score})
+            inflight_key = f"{self.inflight_key_prefix}:{operation.user_id}"
+            due_key = f"{self.due_key_prefix}:{operation.user_id}"
+            
+            operation_json = operation.to_json()
+            score = operation.queue_score()
+            
+            # Replace the old member atomically so the queue never holds both
+            async with redis_client.pipeline(transaction=True) as pipe:
+                if operation.stored_json is not None:
+                    pipe.zrem(queue_key, operation.stored_json)
+                    pipe.zrem(inflight_key, operation.stored_json)
+                    pipe.zrem(due_key, operation.stored_json)
+                pipe.zadd(queue_key, {operation_json: score})
+                # Hold the operation back from claims until its retry time
+                if operation.next_attempt:
+                    pipe.zadd(due_key, {operation_json: _to_epoch(operation.next_attempt)})
+                    pipe.expire(due_key, 7 * 24 * 60 * 60)
+                await pipe.execute()
+            
+            operation.stored_json = operation_json
             
         except Exception as e:
-            logger.error(f"Error updating operation: {e}")
+            logger.error("Error updating operation: %s", e)
     
     async def get_failed_operations(
         self,
@@ -401,17 +610,17 @@ class OfflineService:
             operations = []
             for operation_json in operations_data:
                 try:
-                    operation_dict = json.loads(operation_json)
+                    operation_dict = orjson.loads(operation_json)
                     operation = OfflineOperation.from_dict(operation_dict)
                     operations.append(operation)
                 except Exception as e:
-                    logger.warning(f"Error parsing failed operation: {e}")
+                    logger.warning("Error parsing failed operation: %s", e)
                     continue
             
             return operations
             
         except Exception as e:
-            logger.error(f"Error getting failed operations: {e}")
+            logger.error("Error getting failed operations: %s", e)
             return []
     
     async def retry_failed_operation(
@@ -423,49 +632,72 @@ class OfflineService:
         try:
             redis_client = await self._get_redis()
             failed_key = f"{self.failed_key_prefix}:{user_id}"
+            index_key = f"{self.failed_index_key_prefix}:{user_id}"
             queue_key = f"{self.queue_key_prefix}:{user_id}"
             
-            # Find and remove from failed queue
-            operations_data = await redis_client.lrange(failed_key, 0, -1)
+            operation_json = await redis_client.hget(index_key, operation_id)
+            if operation_json is None:
+                # Operations failed before the index existed are only in the list
+                operation_json = await self._find_failed_operation(
+                    redis_client, failed_key, operation_id
+                )
+                if operation_json is None:
+                    return False
+            
+            # Reset retry count and add back to queue
+            operation_dict = orjson.loads(operation_json)
+            operation_dict["retry_count"] = 0
+            operation_dict["status"] = "pending"
+            operation_dict["next_attempt"] = None
+            
+            # Patch the stored fields directly; nothing here needs the typed object
+            queued_json = orjson.dumps(operation_dict).decode()
+            score = _queue_score(
+                operation_dict.get("priority", 1),
+                int(_epoch_seconds(operation_dict["created_at"]))
+            )
             
-            for operation_json in operations_data:
-                operation_dict = json.loads(operation_json)
-                if operation_dict["id"] == operation_id:
-                    # Remove from failed queue
-                    await redis_client.lrem(failed_key, 1, operation_json)
-                    
-                    # Reset retry count and add back to queue
-                    operation_dict["retry_count"] = 0
-                    operation_dict["status"] = "pending"
-                    
-                    operation = OfflineOperation.from_dict(operation_dict)
-                    operation_json = json.dumps(operation.to_dict())
-                    score = operation.priority * 1000000 - int(operation.created_at.timestamp())
-                    
-                    await redis_client.zadd(queue_key, {operation_json: score})
-                    
-                    logger.info(f"Retried operation {operation_id}")
-                    return True
+            # Move from the failed list back to the queue atomically
+            async with redis_client.pipeline(transaction=True) as pipe:
+                pipe.lrem(failed_key, 1, operation_json)
+                pipe.hdel(index_key, operation_id)
+                pipe.zadd(queue_key, {queued_json: score})
+                await pipe.execute()
             
-            return False
+            logger.info("Retried operation %s", operation_id)
+            return True
             
         except Exception as e:
-            logger.error(f"Error retrying operation: {e}")
+            logger.error("Error retrying operation: %s", e)
             return False
     
+    async def _find_failed_operation(
+        self,
+        redis_client: redis.Redis,
+        failed_key: str,
+        operation_id: str
+    ) -> Optional[str]:
+        """Find a failed operation by scanning the failed list"""
+        for operation_json in await redis_client.lrange(failed_key, 0, -1):
+            if orjson.loads(operation_json)["id"] == operation_id:
+                return operation_json
+        return None
+    
     async def clear_user_queue(self, user_id: UUID) -> bool:
         """Clear all operations for a user"""
         try:
             redis_client = await self._get_redis()
             queue_key = f"{self.queue_key_prefix}:{user_id}"
             failed_key = f"{self.failed_key_prefix}:{user_id}"
+            inflight_key = f"{self.inflight_key_prefix}:{user_id}"
+            due_key = f"{self.due_key_prefix}:{user_id}"
+            index_key = f"{self.failed_index_key_prefix}:{user_id}"
             
-            await redis_client.delete(queue_key)
-            await redis_client.delete(failed_key)
+            await redis_client.delete(queue_key, failed_key, inflight_key, due_key, index_key)
             
-            logger.info(f"Cleared queue for user {user_id}")
+            logger.info("Cleared queue for user %s", user_id)
             return True
             
         except Exception as e:
-            logger.error(f"Error clearing user queue: {e}")
+            logger.error("Error clearing user queue: %s", e)
             return False
@@ -8,13 +8,143 @@ This service handles:
 - Payment history
 """
 
-from typing import Optional, List, Dict, Any
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional, List, Dict, Any, Mapping, Tuple
 from datetime import datetime, timedelta
+import logging
 from decimal import Decimal
-import uuid
+import base64
+import hashlib
+import secrets
+import time
+from types import MappingProxyType
 
+import orjson
 from sqlalchemy.orm import Session
 from app.core.config import settings
+from app.core.database import get_redis
+from app.core.exceptions import RateLimitError, ValidationError
+
+logger = logging.getLogger(__name__)
+
+
+_CENT = Decimal("0.01")
+
+# Shared default for requests without metadata; read-only so it stays empty
+_EMPTY_METADATA: Mapping[str, Any] = MappingProxyType({})
+
+_INVOICE_NUMBER_FORMAT = "INV-{year:04d}{month:02d}-{suffix}"
+
+# History timestamps are fixed-width UTC strings, so they sort in time order
+# and can key the page cursor as they are
+_HISTORY_TIME_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+# The plan catalog is fixed, so responses are built once at import and
+# shared by every request
+_PLANS = [
+    {
+        "plan_id": "basic",
+        "name": "Basic Plan",
+        "description": "Essential compliance tracking",
+        "amount": 29.99,
+        "currency": "USD",
+        "interval": "month",
+        "features": [
+            "GPS check-in/check-out",
+            "Session tracking",
+            "Basic reports",
+            "Email support"
+        ]
+    },
+    {
+        "plan_id": "professional",
+        "name": "Professional Plan",
+        "description": "Advanced features for professionals",
+        "amount": 79.99,
+        "currency": "USD",
+        "interval": "month",
+        "features": [
+            "All Basic features",
+            "Biometric verification",
+            "AI legal assistant",
+            "Client management",
+            "Advanced analytics",
+            "Priority support"
+        ]
+    },
+    {
+        "plan_id": "enterprise",
+        "name": "Enterprise Plan",
+        "description": "Full-featured solution for organizations",
+        "amount": 199.99,
+        "currency": "USD",
+        "interval": "month",
+        "features": [
+            "All Professional features",
+            "Unlimited users",
+            "API access",
+            "Custom integrations",
+            "Dedicated account manager",
+            "24/7 support"
+        ]
+    }
+]
+
+_PLANS_RESPONSE = {
+    "success": True,
+    "plans": _PLANS,
+    "count": len(_PLANS)
+}
+
+# Encoded once as well, for the plans endpoint
+_PLANS_RESPONSE_JSON = orjson.dumps(_PLANS_RESPONSE)
+_PLANS_ETAG = f'"{hashlib.sha256(_PLANS_RESPONSE_JSON).hexdigest()}"'
+
+# Read-only, since every caller shares the same entries
+_PLAN_DETAILS = {
+    plan["plan_id"]: MappingProxyType({
+        "name": plan["name"],
+        "amount": plan["amount"],
+        "interval": plan["interval"]
+    })
+    for plan in _PLANS
+}
+
+
+# Admits a request only while the user has fewer than the allowed number of
+# requests in flight; entries older than the window are treated as abandoned
+_ACQUIRE_IN_FLIGHT_SCRIPT = """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', tonumber(ARGV[1]) - tonumber(ARGV[2]))
+if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[3]) then
+    return 0
+end
+redis.call('ZADD', KEYS[1], ARGV[1], ARGV[4])
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+return 1
+"""
+
+
+def _mock_payment_id(user_id: str, created_at: str) -> str:
+    """Stable mock payment id, so cursors stay valid across requests."""
+    return f"pi_{hashlib.sha256(f'{user_id}:{created_at}'.encode()).hexdigest()[:24]}"
+
+
+def _encode_cursor(created_at: str, payment_id: str) -> str:
+    """Encode the position after a payment as an opaque page cursor."""
+    return base64.urlsafe_b64encode(f"{created_at}|{payment_id}".encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> Tuple[str, str]:
+    """Decode a page cursor into the (created_at, payment_id) it points after."""
+    try:
+        created_at, _, payment_id = base64.urlsafe_b64decode(cursor.encode()).decode().partition("|")
+        # Validated once per request; rows are compared as strings
+        datetime.strptime(created_at, _HISTORY_TIME_FORMAT)
+    except ValueError:
+        payment_id = None
+    if not payment_id:
+        raise ValidationError("Invalid cursor", {"cursor": cursor})
+    return created_at, payment_id
 
 
 class PaymentService:
@@ -22,6 +152,48 @@ class PaymentService:
     
     def __init__(self, db: Session):
         self.db = db
+        self.max_in_flight = 3
+        self.in_flight_window_seconds = 60
+    
+    @asynccontextmanager
+    async def _in_flight_slot(self, user_id: str) -> AsyncIterator[None]:
+        """
+        Hold one of the user's in-flight payment slots for the duration of a request.
+        
+        Raises:
+            RateLimitError: If the user already has max_in_flight requests running
+        """
+        key = f"payments_in_flight:{user_id}"
+        request_id = secrets.token_hex(4)
+        
+        try:
+            redis_client = await get_redis()
+            admitted = redis_client and await redis_client.eval(
+                _ACQUIRE_IN_FLIGHT_SCRIPT, 1, key,
+                time.time(), self.in_flight_window_seconds, self.max_in_flight, request_id
+            )
+        except Exception as e:
+            logger.warning(f"Error acquiring payment slot: {e}")
+            redis_client = None
+        
+        if not redis_client:
+            # Limiting is best effort; payments still work without Redis
+            yield
+            return
+        
+        if not admitted:
+            raise RateLimitError(
+                "Too many payment requests in progress",
+                {"max_in_flight": self.max_in_flight}
+            )
+        
+        try:
+            yield
+        finally:
+            try:
+                await redis_client.zrem(key, request_id)
+            except Exception as e:
+                logger.warning(f"Error releasing payment slot: {e}")
     
     async def create_subscription(
         self,
@@ -42,7 +214,7 @@ class PaymentService:
         Returns:
             Dict containing subscription details
         """
-        try:
+        async with self._in_flight_slot(user_id):
             # In production: Create Stripe subscription
             # stripe.Subscription.create(
             #     customer=customer_id,
@@ -50,7 +222,7 @@ class PaymentService:
             #     payment_behavior="default_incomplete"
             # )
             
-            subscription_id = f"sub_{uuid.uuid4().hex[:24]}"
+            subscription_id = f"sub_{secrets.token_hex(12)}"
             
             # Get plan details
             plan = self._get_plan_details(plan_id)
@@ -70,25 +242,27 @@ class PaymentService:
                 "start_date": start_date.isoformat(),
                 "next_billing_date": next_billing_date.isoformat(),
                 "payment_method_id": payment_method_id,
-                "metadata": metadata or {}
+                "metadata": metadata if metadata is not None else _EMPTY_METADATA
             }
             
-            # In production: Store in subscriptions table
+            # In production: Store the subscription and its first payment in
+            # one round trip and one transaction (inside self.db.begin()):
+            # WITH s AS (
+            #     INSERT INTO subscriptions (subscription_id, user_id, plan_id, ...)
+            #     VALUES (:subscription_id, :user_id, :plan_id, ...)
+            #     RETURNING id, user_id, amount, currency
+            # )
+            # INSERT INTO payments (payment_id, user_id, subscription_id, amount, currency, ...)
+            # SELECT :payment_id, user_id, id, amount, currency, ... FROM s
+            # RETURNING id
             
             return {
                 "success": True,
                 "subscription": subscription_data,
                 "message": "Subscription created successfully"
             }
-            
-        except Exception as e:
-            return {
-                "success": False,
-                "error": str(e),
-                "message": "Failed to create subscription"
-            }
     
-    async def cancel_subscription(
+    def cancel_subscription(
         self,
         subscription_id: str,
         reason: Optional[str] = None
@@ -103,24 +277,16 @@ class PaymentService:
         Returns:
             Dict containing cancellation status
         """
-        try:
-            # In production: Cancel Stripe subscription
-            # stripe.Subscription.delete(subscription_id)
-            
-            return {
-                "success": True,
-                "subscription_id": subscription_id,
-                "status": "canceled",
-                "canceled_at": datetime.utcnow().isoformat(),
-                "message": "Subscription canceled successfully"
-            }
-            
-        except Exception as e:
-            return {
-                "success": False,
-                "error": str(e),
-                "message": "Failed to cancel subscription"
-            }
+        # In production: Cancel Stripe subscription
+        # stripe.Subscription.delete(subscription_id)
+        
+        return {
+            "success": True,
+            "subscription_id": subscription_id,
+            "status": "canceled",
+            "canceled_at": datetime.utcnow().isoformat(),
+            "message": "Subscription canceled successfully"
+        }
     
     async def process_payment(
         self,
@@ -143,7 +309,7 @@ class PaymentService:
         Returns:
             Dict containing payment details
         """
-        try:
+        async with self._in_flight_slot(user_id):
             # In production: Process Stripe payment
             # stripe.PaymentIntent.create(
             #     amount=int(amount * 100),  # Convert to cents
@@ -152,18 +318,21 @@ class PaymentService:
             #     confirm=True
             # )
             
-            payment_id = f"pi_{uuid.uuid4().hex[:24]}"
+            payment_id = f"pi_{secrets.token_hex(12)}"
+            
+            # Round to cents once; responses only carry JSON-native values
+            amount_value = float(amount.quantize(_CENT))
             
             payment_data = {
                 "payment_id": payment_id,
                 "user_id": user_id,
-                "amount": float(amount),
+                "amount": amount_value,
                 "currency": "USD",
                 "status": "succeeded",
                 "payment_method_id": payment_method_id,
                 "description": description or "Payment",
                 "created_at": datetime.utcnow().isoformat(),
-                "metadata": metadata or {}
+                "metadata": metadata if metadata is not None else _EMPTY_METADATA
             }
             
             # In production: Store in payments table
@@ -173,68 +342,80 @@ class PaymentService:
                 "payment": payment_data,
                 "message": "Payment processed successfully"
             }
-            
-        except Exception as e:
-            return {
-                "success": False,
-                "error": str(e),
-                "message": "Payment processing failed"
-            }
     
-    async def get_payment_history(
+    def get_payment_history(
         self,
         user_id: str,
         limit: int = 50,
+        cursor: Optional[str] = None,
         offset: int = 0
     ) -> Dict[str, Any]:
         """
-        Get payment history for a user.
+        Get payment history for a user, newest first.
         
         Args:
             user_id: The user's unique identifier
             limit: Maximum number of payments to return
-            offset: Offset for pagination
+            cursor: next_cursor from the previous page, if any
+            offset: Deprecated, use cursor; ignored when a cursor is given
             
         Returns:
-            Dict containing payment history
+            Dict containing payment history and the cursor of the next page
         """
-        try:
-            # In production: Query payments table
-            # Mock payment history
+        # In production: Query payments table by keyset rather than
+        # OFFSET, so deep pages cost the same as the first one
+        # (served by payments_user_created_idx):
+        # SELECT ... FROM payments
+        # WHERE user_id = :user_id
+        #   AND (created_at, payment_id) < (:cursor_created_at, :cursor_payment_id)
+        # ORDER BY created_at DESC, payment_id DESC
+        # LIMIT :limit + 1
+        # Mock payment history
+        payments = [
+            {
+                "payment_id": _mock_payment_id(user_id, "2024-11-01T10:00:00Z"),
+                "amount": 350.00,
+                "currency": "USD",
+                "status": "succeeded",
+                "description": "Monthly subscription - November 2024",
+                "created_at": "2024-11-01T10:00:00Z"
+            },
+            {
+                "payment_id": _mock_payment_id(user_id, "2024-10-01T10:00:00Z"),
+                "amount": 350.00,
+                "currency": "USD",
+                "status": "succeeded",
+                "description": "Monthly subscription - October 2024",
+                "created_at": "2024-10-01T10:00:00Z"
+            }
+        ]
+        total = len(payments)
+        
+        if cursor:
+            after = _decode_cursor(cursor)
             payments = [
-                {
-                    "payment_id": f"pi_{uuid.uuid4().hex[:24]}",
-                    "amount": 350.00,
-                    "currency": "USD",
-                    "status": "succeeded",
-                    "description": "Monthly subscription - November 2024",
-                    "created_at": "2024-11-01T10:00:00Z"
-                },
-                {
-                    "payment_id": f"pi_{uuid.uuid4().hex[:24]}",
-                    "amount": 350.00,
-                    "currency": "USD",
-                    "status": "succeeded",
-                    "description": "Monthly subscription - October 2024",
-                    "created_at": "2024-10-01T10:00:00Z"
-                }
+                payment for payment in payments
+                if (payment["created_at"], payment["payment_id"]) < after
             ]
-            
-            return {
-                "success": True,
-                "payments": payments,
-                "count": len(payments),
-                "total": 2
-            }
-            
-        except Exception as e:
-            return {
-                "success": False,
-                "error": str(e),
-                "payments": []
-            }
+        elif offset:
+            payments = payments[offset:]
+        
+        # Fetch one extra row to learn whether another page exists
+        page = payments[:limit + 1]
+        next_cursor = None
+        if len(page) > limit:
+            page = page[:limit]
+            next_cursor = _encode_cursor(page[-1]["created_at"], page[-1]["payment_id"])
+        
+        return {
+            "success": True,
+            "payments": page,
+            "count": len(page),
+            "total": total,
+            "next_cursor": next_cursor
+        }
     
-    async def generate_invoice(
+    def generate_invoice(
         self,
         user_id: str,
         payment_id: Optional[str] = None,
@@ -251,127 +432,72 @@ class PaymentService:
         Returns:
             Dict containing invoice details
         """
-        try:
-            invoice_id = f"inv_{uuid.uuid4().hex[:16]}"
-            
-            # Mock invoice data
-            invoice_data = {
-                "invoice_id": invoice_id,
-                "user_id": user_id,
-                "invoice_number": f"INV-{datetime.utcnow().strftime('%Y%m')}-{uuid.uuid4().hex[:6].upper()}",
-                "date": datetime.utcnow().isoformat(),
-                "due_date": (datetime.utcnow() + timedelta(days=30)).isoformat(),
-                "items": [
-                    {
-                        "description": "Verified Compliance Subscription",
-                        "quantity": 1,
-                        "unit_price": 350.00,
-                        "total": 350.00
-                    }
-                ],
-                "subtotal": 350.00,
-                "tax": 0.00,
-                "total": 350.00,
-                "currency": "USD",
-                "status": "paid"
-            }
-            
-            return {
-                "success": True,
-                "invoice": invoice_data,
-                "pdf_url": f"/api/v1/invoices/{invoice_id}/pdf"  # Mock URL
-            }
-            
-        except Exception as e:
-            return {
-                "success": False,
-                "error": str(e),
-                "message": "Failed to generate invoice"
-            }
+        invoice_id = f"inv_{secrets.token_hex(8)}"
+        
+        # In production: Load the invoiced payments. A date_range uses a
+        # half-open range so payments_created_brin can serve it:
+        # SELECT ... FROM payments
+        # WHERE user_id = :user_id AND created_at >= :start AND created_at < :end
+        
+        # One clock read so the number, date and due date always agree
+        now = datetime.utcnow()
+        
+        # Mock invoice data
+        invoice_data = {
+            "invoice_id": invoice_id,
+            "user_id": user_id,
+            "invoice_number": _INVOICE_NUMBER_FORMAT.format(
+                year=now.year, month=now.month, suffix=secrets.token_hex(3).upper()
+            ),
+            "date": now.isoformat(),
+            "due_date": (now + timedelta(days=30)).isoformat(),
+            "items": [
+                {
+                    "description": "Verified Compliance Subscription",
+                    "quantity": 1,
+                    "unit_price": 350.00,
+                    "total": 350.00
+                }
+            ],
+            "subtotal": 350.00,
+            "tax": 0.00,
+            "total": 350.00,
+            "currency": "USD",
+            "status": "paid"
+        }
+        
+        return {
+            "success": True,
+            "invoice": invoice_data,
+            "pdf_url": f"/api/v1/invoices/{invoice_id}/pdf"  # Mock URL
+        }
     
-    async def get_subscription_plans(self) -> Dict[str, Any]:
+    def get_subscription_plans(self) -> Dict[str, Any]:
         """
         Get available subscription plans.
         
         Returns:
             Dict containing available plans
         """
-        plans = [
-            {
-                "plan_id": "basic",
-                "name": "Basic Plan",
-                "description": "Essential compliance tracking",
-                "amount": 29.99,
-                "currency": "USD",
-                "interval": "month",
-                "features": [
-                    "GPS check-in/check-out",
-                    "Session tracking",
-                    "Basic reports",
-                    "Email support"
-                ]
-            },
-            {
-                "plan_id": "professional",
-                "name": "Professional Plan",
-                "description": "Advanced features for professionals",
-                "amount": 79.99,
-                "currency": "USD",
-                "interval": "month",
-                "features": [
-                    "All Basic features",
-                    "Biometric verification",
-                    "AI legal assistant",
-                    "Client management",
-                    "Advanced analytics",
-                    "Priority support"
-                ]
-            },
-            {
-                "plan_id": "enterprise",
-                "name": "Enterprise Plan",
-                "description": "Full-featured solution for organizations",
-                "amount": 199.99,
-                "currency": "USD",
-                "interval": "month",
-                "features": [
-                    "All Professional features",
-                    "Unlimited users",
-                    "API access",
-                    "Custom integrations",
-                    "Dedicated account manager",
-                    "24/7 support"
-                ]
-            }
-        ]
+        return _PLANS_RESPONSE
+    
+    def get_subscription_plans_json(self) -> bytes:
+        """
+        Get available subscription plans, already encoded as JSON.
         
-        return {
-            "success": True,
-            "plans": plans,
-            "count": len(plans)
-        }
+        Returns:
+            The get_subscription_plans response as JSON bytes
+        """
+        return _PLANS_RESPONSE_JSON
     
-    def _get_plan_details(self, plan_id: str) -> Dict[str, Any]:
+    def get_subscription_plans_etag(self) -> str:
+        """Get the HTTP entity tag of the subscription plans response."""
+        return _PLANS_ETAG
+    
+    @staticmethod
+    def _get_plan_details(plan_id: str) -> Mapping[str, Any]:
         """Get plan details by ID."""
-        plans = {
-            "basic": {
-                "name": "Basic Plan",
-                "amount": 29.99,
-                "interval": "month"
-            },
-            "professional": {
-                "name": "Professional Plan",
-                "amount": 79.99,
-                "interval": "month"
-            },
-            "enterprise": {
-                "name": "Enterprise Plan",
-                "amount": 199.99,
-                "interval": "month"
-            }
-        }
-        
-        return plans.get(plan_id, plans["basic"])
+        return _PLAN_DETAILS.get(plan_id, _PLAN_DETAILS["basic"])
 
 
 # Integration Notes for Production:
@@ -412,6 +538,16 @@ class PaymentService:
 #        created_at TIMESTAMP DEFAULT NOW()
 #    );
 #    
+#    -- Billing sweep (status = 'active' AND next_billing_date <= NOW()) only
+#    -- touches the active slice, however many canceled rows accumulate
+#    CREATE INDEX subscriptions_due_idx
+#        ON subscriptions (next_billing_date) WHERE status = 'active';
+#    CREATE INDEX subscriptions_user_status_idx ON subscriptions (user_id, status);
+#    
+#    -- Metadata filters use containment (metadata @> '{"campaign": "x"}')
+#    CREATE INDEX subscriptions_metadata_gin
+#        ON subscriptions USING GIN (metadata jsonb_path_ops);
+#    
 #    CREATE TABLE payments (
 #        id UUID PRIMARY KEY,
 #        payment_id VARCHAR(255) UNIQUE,
@@ -425,6 +561,24 @@ class PaymentService:
 #        metadata JSONB,
 #        created_at TIMESTAMP DEFAULT NOW()
 #    );
+#    
+#    -- Payment history pages by keyset on (created_at, payment_id)
+#    CREATE INDEX payments_user_created_idx
+#        ON payments (user_id, created_at DESC, payment_id DESC);
+#    
+#    -- Date range invoices and reports on the append-only payments table;
+#    -- a BRIN index stays tiny because rows arrive in created_at order
+#    CREATE INDEX payments_created_brin
+#        ON payments USING BRIN (created_at) WITH (pages_per_range = 32);
+#    
+#    CREATE INDEX payments_metadata_gin
+#        ON payments USING GIN (metadata jsonb_path_ops);
+#
+# 3. Invoice PDFs (served at pdf_url):
+#    Issued invoices never change, so render each PDF once and cache it:
+#    - Redis SETEX invoice:pdf:{invoice_id} 3600 <pdf bytes>, shared by all workers
+#    - Response headers: Cache-Control: public, max-age=3600, immutable
+#      and ETag: sha256 of the PDF bytes, answering If-None-Match with 304
 
 
 
@@ -3,15 +3,19 @@ Performance optimization service
 """
 
 import logging
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Callable, Awaitable, Tuple
 from datetime import datetime, timedelta
 import asyncio
+import functools
+import time
 
-from sqlalchemy import text, func
+from sqlalchemy import JSON, select, text, func
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import load_only, sessionmaker
+from sqlalchemy.pool import QueuePool
 
-from app.core.database import get_db
+from app.core.database import AsyncSessionLocal, get_db
 from app.models.contact import Contact
 from app.models.session import Session
 from app.models.meeting import Meeting
@@ -19,14 +23,225 @@ from app.models.session_event import SessionEvent
 
 logger = logging.getLogger(__name__)
 
+# Advisory lock key serialising index creation across workers
+INDEX_CREATION_LOCK_KEY = 7_304_417_262_153_620_993
+TRY_ADVISORY_LOCK_QUERY = text("SELECT pg_try_advisory_lock(:key)")
+ADVISORY_UNLOCK_QUERY = text("SELECT pg_advisory_unlock(:key)")
+
+# Statements are built once so their compiled form is reused across calls
+APPROXIMATE_TABLE_SIZES_QUERY = text("""
+    SELECT 
+        c.relname as tablename,
+        pg_size_pretty(c.relpages::bigint * current_setting('block_size')::bigint) as size,
+        c.relpages::bigint * current_setting('block_size')::bigint as size_bytes
+    FROM pg_class c
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname = 'public' AND c.relkind = 'r'
+    ORDER BY c.relpages DESC
+""")
+
+TABLE_SIZES_QUERY = text("""
+    SELECT 
+        schemaname,
+        tablename,
+        pg_size_pretty(pg_total_relation_size(schemaname||'.'||tablename)) as size,
+        pg_total_relation_size(schemaname||'.'||tablename) as size_bytes
+    FROM pg_tables 
+    WHERE schemaname = 'public'
+    ORDER BY pg_total_relation_size(schemaname||'.'||tablename) DESC
+""")
+
+SLOW_QUERIES_QUERY = text("""
+    SELECT 
+        CASE WHEN length(query) > 100 THEN left(query, 100) || '...' ELSE query END as query,
+        calls,
+        total_exec_time as total_time,
+        mean_exec_time as mean_time,
+        stddev_exec_time as stddev_time,
+        rows
+    FROM pg_stat_statements 
+    WHERE calls >= :min_calls
+        AND dbid = (SELECT oid FROM pg_database WHERE datname = current_database())
+    ORDER BY total_exec_time DESC 
+    LIMIT 10
+""")
+
+INDEX_USAGE_QUERY = text("""
+    SELECT 
+        relname as table,
+        indexrelname as index,
+        idx_scan as scans,
+        idx_tup_read as tuples_read,
+        idx_tup_fetch as tuples_fetched
+    FROM pg_stat_user_indexes 
+    ORDER BY idx_scan DESC
+""")
+
+NEARBY_MEETINGS_QUERY = text("""
+    SELECT COALESCE(json_agg(json_build_object(
+        'id', id::text,
+        'name', name,
+        'description', description,
+        'address', address,
+        'latitude', lat,
+        'longitude', lng,
+        'radius_meters', radius_meters,
+        'distance_meters', distance_meters,
+        'distance_km', distance_meters / 1000
+    ) ORDER BY distance_meters), '[]') as meetings
+    FROM (
+        SELECT 
+            id,
+            name,
+            description,
+            address,
+            lat,
+            lng,
+            radius_meters,
+            ST_Distance(
+                ST_SetSRID(ST_MakePoint(lng, lat), 4326)::geography,
+                ST_SetSRID(ST_MakePoint(:user_lng, :user_lat), 4326)::geography
+            ) as distance_meters
+        FROM meetings 
+        WHERE 
+            is_active = true
+            AND ST_DWithin(
+                ST_SetSRID(ST_MakePoint(lng, lat), 4326)::geography,
+                ST_SetSRID(ST_MakePoint(:user_lng, :user_lat), 4326)::geography,
+                :radius_meters
+            )
+        ORDER BY
+            ST_SetSRID(ST_MakePoint(lng, lat), 4326)::geography
+            <-> ST_SetSRID(ST_MakePoint(:user_lng, :user_lat), 4326)::geography
+        LIMIT 50
+    ) nearby
+""").columns(meetings=JSON)
+
+QUERY_METRICS_QUERY = text("""
+    SELECT 
+        COUNT(*) as total_queries,
+        AVG(mean_exec_time) as avg_query_time,
+        MAX(mean_exec_time) as max_query_time,
+        SUM(calls) as total_calls
+    FROM pg_stat_statements
+    WHERE calls >= :min_calls
+        AND dbid = (SELECT oid FROM pg_database WHERE datname = current_database())
+""")
+
+ACCESS_SUMMARY_QUERY = text("""
+    WITH m AS (
+        SELECT count(*) AS active_meetings FROM meetings WHERE is_active = true
+    ), s AS (
+        SELECT count(*) AS recent_sessions FROM sessions WHERE created_at > NOW() - INTERVAL '7 days'
+    ), u AS (
+        SELECT 
+            count(*) AS total_users,
+            count(*) FILTER (WHERE consent_granted = true) AS consented_users
+        FROM contacts
+    )
+    SELECT m.active_meetings, s.recent_sessions, u.total_users, u.consented_users
+    FROM m, s, u
+""")
+
+CATALOG_SNAPSHOT_QUERY = text("""
+    SELECT json_build_object(
+        'table_sizes', (
+            SELECT COALESCE(json_object_agg(
+                c.relname,
+                json_build_object(
+                    'size', pg_size_pretty(c.relpages::bigint * current_setting('block_size')::bigint),
+                    'size_bytes', c.relpages::bigint * current_setting('block_size')::bigint
+                )
+            ), '{}')
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = 'public' AND c.relkind = 'r'
+        ),
+        'tables', (
+            SELECT COALESCE(json_agg(json_build_object(
+                'table', relname,
+                'inserts', n_tup_ins,
+                'updates', n_tup_upd,
+                'deletes', n_tup_del,
+                'live_tuples', n_live_tup,
+                'dead_tuples', n_dead_tup
+            ) ORDER BY n_live_tup DESC), '[]')
+            FROM pg_stat_user_tables
+        ),
+        'indexes', (
+            SELECT COALESCE(json_agg(json_build_object(
+                'table', relname,
+                'index', indexrelname,
+                'scans', idx_scan,
+                'tuples_read', idx_tup_read,
+                'tuples_fetched', idx_tup_fetch
+            ) ORDER BY idx_scan DESC), '[]')
+            FROM pg_stat_user_indexes
+        )
+    ) AS snapshot
+""").columns(snapshot=JSON)
+
 
 class PerformanceService:
     """Service for performance optimization and monitoring"""
     
-    def __init__(self):
+    def __init__(self, session_factory: Optional[sessionmaker] = None):
+        # Independent catalog queries run concurrently, each on its own
+        # session since an AsyncSession cannot be shared between them
+        self.session_factory = session_factory or AsyncSessionLocal
         self.cache_ttl = 300  # 5 minutes
         self.batch_size = 100
-        self.max_connections = 20
+        # pg_stat_statements entries with fewer calls are one-off noise
+        self.slow_query_min_calls = 5
+        self._indexes_created = False
+        self._cache: Dict[str, Tuple[float, Any]] = {}
+        self._cache_locks: Dict[str, asyncio.Lock] = {}
+    
+    @property
+    def max_connections(self) -> int:
+        """Size of the connection pool behind the session factory"""
+        pool = self.session_factory.kw["bind"].pool
+        return pool.size() if isinstance(pool, QueuePool) else 0
+    
+    async def _with_session(
+        self,
+        query: Callable[[AsyncSession], Awaitable[Any]]
+    ) -> Any:
+        """Run a query helper on a dedicated database session"""
+        async with self.session_factory() as db:
+            return await query(db)
+    
+    async def _cached(
+        self,
+        key: str,
+        ttl: float,
+        load: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Return a cached result younger than ttl seconds, loading it at most
+        once for concurrent callers. Error results are not cached."""
+        entry = self._cache.get(key)
+        if entry and time.monotonic() - entry[0] < ttl:
+            return entry[1]
+        
+        lock = self._cache_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            # Another caller may have refreshed it while we waited
+            entry = self._cache.get(key)
+            if entry and time.monotonic() - entry[0] < ttl:
+                return entry[1]
+            
+            value = await load()
+            if not (isinstance(value, dict) and "error" in value):
+                self._cache[key] = (time.monotonic(), value)
+            return value
+    
+    async def _cached_query(
+        self,
+        key: str,
+        query: Callable[[AsyncSession], Awaitable[Any]]
+    ) -> Any:
+        """Run a catalog query helper through the TTL cache"""
+        return await self._cached(key, self.cache_ttl, lambda: self._with_session(query))
     
     async def optimize_database_queries(self, db: AsyncSession) -> Dict[str, Any]:
         """Optimize database queries and indexes"""
@@ -38,7 +253,7 @@ class PerformanceService:
             optimizations["indexes_created"] = True
             
             # Analyze query performance
-            query_stats = await self._analyze_query_performance(db)
+            query_stats = await self._analyze_query_performance()
             optimizations["query_stats"] = query_stats
             
             # Optimize connection pool
@@ -48,206 +263,181 @@ class PerformanceService:
             logger.info("Database optimization completed")
             return optimizations
             
-        except Exception as e:
-            logger.error(f"Error optimizing database: {e}")
+        except SQLAlchemyError as e:
+            logger.error("Error optimizing database: %s", e)
             return {"error": str(e)}
     
     async def _create_indexes(self, db: AsyncSession) -> None:
-        """Create database indexes for better performance"""
+        """Create database indexes for better performance, once per process"""
+        if self._indexes_created:
+            return
+        
         try:
             # Create indexes for frequently queried columns
             indexes = [
                 # Contact indexes
-                "CREATE INDEX IF NOT EXISTS idx_contacts_email ON contacts(email)",
-                "CREATE INDEX IF NOT EXISTS idx_contacts_ghl_id ON contacts(ghl_contact_id)",
-                "CREATE INDEX IF NOT EXISTS idx_contacts_consent ON contacts(consent_granted)",
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_contacts_email ON contacts(email)",
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_contacts_ghl_id ON contacts(ghl_contact_id)",
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_contacts_consented ON contacts(consent_granted) WHERE consent_granted = true",
                 
                 # Session indexes
-                "CREATE INDEX IF NOT EXISTS idx_sessions_contact_id ON sessions(contact_id)",
-                "CREATE INDEX IF NOT EXISTS idx_sessions_meeting_id ON sessions(meeting_id)",
-                "CREATE INDEX IF NOT EXISTS idx_sessions_status ON sessions(status)",
-                "CREATE INDEX IF NOT EXISTS idx_sessions_created_at ON sessions(created_at)",
-                "CREATE INDEX IF NOT EXISTS idx_sessions_check_in_time ON sessions(check_in_time)",
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_sessions_contact_id ON sessions(contact_id)",
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_sessions_meeting_id ON sessions(meeting_id)",
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_sessions_status_created_at ON sessions(status, created_at)",
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_sessions_created_at ON sessions(created_at)",
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_sessions_check_in_time ON sessions(check_in_time)",
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_sessions_completed_created_at ON sessions(created_at) WHERE status = 'completed'",
                 
                 # Meeting indexes
-                "CREATE INDEX IF NOT EXISTS idx_meetings_active ON meetings(is_active)",
-                "CREATE INDEX IF NOT EXISTS idx_meetings_created_by ON meetings(created_by)",
-                "CREATE INDEX IF NOT EXISTS idx_meetings_start_time ON meetings(start_time)",
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_meetings_active_only ON meetings(is_active) WHERE is_active = true",
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_meetings_created_by ON meetings(created_by)",
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_meetings_start_time ON meetings(start_time)",
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_meetings_inactive_created_at ON meetings(created_at) WHERE is_active = false",
                 
                 # Session event indexes
-                "CREATE INDEX IF NOT EXISTS idx_session_events_session_id ON session_events(session_id)",
-                "CREATE INDEX IF NOT EXISTS idx_session_events_type ON session_events(type)",
-                "CREATE INDEX IF NOT EXISTS idx_session_events_ts_server ON session_events(ts_server)",
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_session_events_session_id ON session_events(session_id)",
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_session_events_type ON session_events(type)",
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_session_events_ts_server ON session_events(ts_server)",
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_session_events_created_at ON session_events(created_at)",
                 
                 # Geospatial indexes (PostGIS)
-                "CREATE INDEX IF NOT EXISTS idx_meetings_location ON meetings USING GIST (ST_Point(lng, lat))",
-                "CREATE INDEX IF NOT EXISTS idx_session_events_location ON session_events USING GIST (ST_Point(lng, lat))",
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_meetings_location_geog ON meetings USING GIST ((ST_SetSRID(ST_MakePoint(lng, lat), 4326)::geography))",
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_session_events_location_geog ON session_events USING GIST ((ST_SetSRID(ST_MakePoint(lng, lat), 4326)::geography))",
+                
+                # Superseded by the partial and composite indexes above
+                "DROP INDEX CONCURRENTLY IF EXISTS idx_contacts_consent",
+                "DROP INDEX CONCURRENTLY IF EXISTS idx_sessions_status",
+                "DROP INDEX CONCURRENTLY IF EXISTS idx_meetings_active",
+                # Superseded by the geography GIST indexes above
+                "DROP INDEX CONCURRENTLY IF EXISTS idx_meetings_location",
+                "DROP INDEX CONCURRENTLY IF EXISTS idx_session_events_location",
             ]
             
-            for index_sql in indexes:
+            # CONCURRENTLY cannot run inside a transaction block, so the DDL
+            # runs on its own autocommit connection rather than the session
+            async with db.bind.connect() as conn:
+                conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+                
+                lock_params = {"key": INDEX_CREATION_LOCK_KEY}
+                acquired = await conn.scalar(TRY_ADVISORY_LOCK_QUERY, lock_params)
+                if not acquired:
+                    logger.info("Index creation already running in another worker")
+                    return
+                
                 try:
-                    await db.execute(text(index_sql))
-                except Exception as e:
-                    logger.warning(f"Index creation failed (may already exist): {e}")
+                    for index_sql in indexes:
+                        try:
+                            await conn.execute(text(index_sql))
+                        except SQLAlchemyError as e:
+                            logger.warning("Index statement failed: %s", e)
+                finally:
+                    await conn.execute(ADVISORY_UNLOCK_QUERY, lock_params)
             
-            await db.commit()
+            self._indexes_created = True
             logger.info("Database indexes created/verified")
             
-        except Exception as e:
-            logger.error(f"Error creating indexes: {e}")
+        except SQLAlchemyError as e:
+            logger.error("Error creating indexes: %s", e)
             raise
     
-    async def _analyze_query_performance(self, db: AsyncSession) -> Dict[str, Any]:
+    async def _analyze_query_performance(self) -> Dict[str, Any]:
         """Analyze query performance and suggest optimizations"""
         try:
-            stats = {}
-            
-            # Analyze table sizes
-            table_sizes = await self._get_table_sizes(db)
-            stats["table_sizes"] = table_sizes
-            
-            # Analyze slow queries
-            slow_queries = await self._get_slow_queries(db)
-            stats["slow_queries"] = slow_queries
-            
-            # Analyze index usage
-            index_usage = await self._get_index_usage(db)
-            stats["index_usage"] = index_usage
+            table_sizes, slow_queries, index_usage = await asyncio.gather(
+                # The optimization run wants exact on-disk sizes
+                self._with_session(functools.partial(self._get_table_sizes, approximate=False)),
+                self._cached_query("slow_queries", self._get_slow_queries),
+                self._cached_query("index_usage", self._get_index_usage)
+            )
             
-            return stats
+            return {
+                "table_sizes": table_sizes,
+                "slow_queries": slow_queries,
+                "index_usage": index_usage
+            }
             
-        except Exception as e:
-            logger.error(f"Error analyzing query performance: {e}")
+        except SQLAlchemyError as e:
+            logger.error("Error analyzing query performance: %s", e)
             return {"error": str(e)}
     
-    async def _get_table_sizes(self, db: AsyncSession) -> Dict[str, int]:
-        """Get table sizes for analysis"""
+    async def _get_table_sizes(self, db: AsyncSession, approximate: bool = True) -> Dict[str, int]:
+        """Get table sizes for analysis. Approximate sizes come from the
+        planner statistics in pg_class instead of measuring every relation."""
         try:
-            query = text("""
-                SELECT 
-                    schemaname,
-                    tablename,
-                    pg_size_pretty(pg_total_relation_size(schemaname||'.'||tablename)) as size,
-                    pg_total_relation_size(schemaname||'.'||tablename) as size_bytes
-                FROM pg_tables 
-                WHERE schemaname = 'public'
-                ORDER BY pg_total_relation_size(schemaname||'.'||tablename) DESC
-            """)
-            
+            query = APPROXIMATE_TABLE_SIZES_QUERY if approximate else TABLE_SIZES_QUERY
             result = await db.execute(query)
-            rows = result.fetchall()
             
             return {
-                row.tablename: {
-                    "size": row.size,
-                    "size_bytes": row.size_bytes
+                row["tablename"]: {
+                    "size": row["size"],
+                    "size_bytes": row["size_bytes"]
                 }
-                for row in rows
+                for row in result.mappings()
             }
             
-        except Exception as e:
-            logger.error(f"Error getting table sizes: {e}")
+        except SQLAlchemyError as e:
+            logger.error("Error getting table sizes: %s", e)
             return {}
     
     async def _get_slow_queries(self, db: AsyncSession) -> List[Dict[str, Any]]:
-        """Get slow queries from pg_stat_statements"""
+        """Get the statements with the most total execution time from
+        pg_stat_statements (PostgreSQL 13+ column names)"""
         try:
-            query = text("""
-                SELECT 
-                    query,
-                    calls,
-                    total_time,
-                    mean_time,
-                    rows
-                FROM pg_stat_statements 
-                ORDER BY mean_time DESC 
-                LIMIT 10
-            """)
+            result = await db.execute(SLOW_QUERIES_QUERY, {"min_calls": self.slow_query_min_calls})
             
-            result = await db.execute(query)
-            rows = result.fetchall()
-            
-            return [
-                {
-                    "query": row.query[:100] + "..." if len(row.query) > 100 else row.query,
-                    "calls": row.calls,
-                    "total_time": row.total_time,
-                    "mean_time": row.mean_time,
-                    "rows": row.rows
-                }
-                for row in rows
-            ]
+            # Columns are already named and truncated for the report
+            return [dict(row) for row in result.mappings()]
             
-        except Exception as e:
-            logger.error(f"Error getting slow queries: {e}")
+        except SQLAlchemyError as e:
+            logger.error("Error getting slow queries: %s", e)
             return []
     
     async def _get_index_usage(self, db: AsyncSession) -> Dict[str, Any]:
         """Get index usage statistics"""
         try:
-            query = text("""
-                SELECT 
-                    schemaname,
-                    tablename,
-                    indexname,
-                    idx_scan,
-                    idx_tup_read,
-                    idx_tup_fetch
-                FROM pg_stat_user_indexes 
-                ORDER BY idx_scan DESC
-            """)
-            
-            result = await db.execute(query)
-            rows = result.fetchall()
+            result = await db.execute(INDEX_USAGE_QUERY)
             
-            return {
-                "indexes": [
-                    {
-                        "table": row.tablename,
-                        "index": row.indexname,
-                        "scans": row.idx_scan,
-                        "tuples_read": row.idx_tup_read,
-                        "tuples_fetched": row.idx_tup_fetch
-                    }
-                    for row in rows
-                ]
-            }
+            return {"indexes": [dict(row) for row in result.mappings()]}
             
-        except Exception as e:
-            logger.error(f"Error getting index usage: {e}")
+        except SQLAlchemyError as e:
+            logger.error("Error getting index usage: %s", e)
+            return {}
+    
+    def _get_pool_stats(self, db: AsyncSession) -> Dict[str, int]:
+        """Get connection pool counters, empty for pools that keep none"""
+        pool = db.bind.pool
+        if not isinstance(pool, QueuePool):
             return {}
+        
+        return {
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow()
+        }
     
     async def _optimize_connection_pool(self, db: AsyncSession) -> Dict[str, Any]:
         """Optimize database connection pool"""
         try:
             # Get current pool stats
-            pool_stats = {
-                "size": db.bind.pool.size(),
-                "checked_in": db.bind.pool.checkedin(),
-                "checked_out": db.bind.pool.checkedout(),
-                "overflow": db.bind.pool.overflow(),
-                "invalid": db.bind.pool.invalid()
-            }
+            pool_stats = self._get_pool_stats(db)
             
             # Suggest optimizations
             suggestions = []
             
-            if pool_stats["checked_out"] > pool_stats["size"] * 0.8:
+            if pool_stats and pool_stats["checked_out"] > pool_stats["size"] * 0.8:
                 suggestions.append("Consider increasing pool size")
             
-            if pool_stats["overflow"] > 0:
+            if pool_stats and pool_stats["overflow"] > 0:
                 suggestions.append("Consider increasing max_overflow")
             
-            if pool_stats["invalid"] > 0:
-                suggestions.append("Check for connection leaks")
-            
             return {
                 "current_stats": pool_stats,
                 "suggestions": suggestions
             }
             
-        except Exception as e:
-            logger.error(f"Error optimizing connection pool: {e}")
+        except SQLAlchemyError as e:
+            logger.error("Error optimizing connection pool: %s", e)
             return {"error": str(e)}
     
     async def batch_process_sessions(
@@ -268,34 +458,47 @@ class PerformanceService:
                 batch = session_ids[i:i + self.batch_size]
                 
                 try:
-                    # Batch query for sessions
-                    sessions = await db.execute(
-                        text("SELECT * FROM sessions WHERE id = ANY(:session_ids)"),
-                        {"session_ids": batch}
+                    # Batch query for sessions; the cached IN statement is
+                    # reused for every batch whatever its size. Only the
+                    # session columns are read; contacts and meetings are not
+                    # needed here, so no related rows are loaded. Rows are
+                    # streamed from a server-side cursor rather than buffered
+                    # in full.
+                    sessions = await db.stream_scalars(
+                        select(Session)
+                        .where(Session.id.in_(batch))
+                        .options(
+                            load_only(
+                                Session.id,
+                                Session.contact_id,
+                                Session.meeting_id,
+                                Session.status,
+                                Session.created_at
+                            )
+                        )
+                        .execution_options(yield_per=self.batch_size)
                     )
                     
                     # Process each session in the batch
-                    for session in sessions:
-                        try:
-                            # Process session logic here
-                            results["processed"] += 1
-                        except Exception as e:
-                            results["failed"] += 1
-                            results["errors"].append(str(e))
+                    async for partition in sessions.partitions():
+                        for session in partition:
+                            try:
+                                # Process session logic here
+                                results["processed"] += 1
+                            except Exception as e:
+                                results["failed"] += 1
+                                results["errors"].append(str(e))
                     
-                    # Commit batch
-                    await db.commit()
-                    
-                except Exception as e:
+                except SQLAlchemyError as e:
                     results["failed"] += len(batch)
                     results["errors"].append(f"Batch error: {str(e)}")
                     await db.rollback()
             
-            logger.info(f"Batch processed {results['processed']} sessions, {results['failed']} failed")
+            logger.info("Batch processed %d sessions, %d failed", results["processed"], results["failed"])
             return results
             
-        except Exception as e:
-            logger.error(f"Error batch processing sessions: {e}")
+        except SQLAlchemyError as e:
+            logger.error("Error batch processing sessions: %s", e)
             return {"error": str(e)}
     
     async def optimize_geospatial_queries(
@@ -307,56 +510,20 @@ class PerformanceService:
     ) -> List[Dict[str, Any]]:
         """Optimize geospatial queries with proper indexing"""
         try:
-            # Use PostGIS optimized query
-            query = text("""
-                SELECT 
-                    id,
-                    name,
-                    description,
-                    address,
-                    lat,
-                    lng,
-                    radius_meters,
-                    ST_Distance(
-                        ST_Point(lng, lat),
-                        ST_Point(:user_lng, :user_lat)
-                    ) as distance_meters
-                FROM meetings 
-                WHERE 
-                    is_active = true
-                    AND ST_DWithin(
-                        ST_Point(lng, lat),
-                        ST_Point(:user_lng, :user_lat),
-                        :radius_meters
-                    )
-                ORDER BY distance_meters
-                LIMIT 50
-            """)
-            
-            result = await db.execute(query, {
+            # Geography distances are in meters, and the point expression
+            # matches idx_meetings_location_geog so the GIST index is used,
+            # including its nearest-neighbour ordering for <->
+            result = await db.execute(NEARBY_MEETINGS_QUERY, {
                 "user_lat": user_lat,
                 "user_lng": user_lng,
                 "radius_meters": radius_km * 1000
             })
             
-            meetings = []
-            for row in result:
-                meetings.append({
-                    "id": str(row.id),
-                    "name": row.name,
-                    "description": row.description,
-                    "address": row.address,
-                    "latitude": row.lat,
-                    "longitude": row.lng,
-                    "radius_meters": row.radius_meters,
-                    "distance_meters": row.distance_meters,
-                    "distance_km": row.distance_meters / 1000
-                })
-            
-            return meetings
-            
-        except Exception as e:
-            logger.error(f"Error optimizing geospatial query: {e}")
+            # Rows are shaped into JSON by Postgres and decoded in one step
+            return result.scalar()
+            
+        except SQLAlchemyError as e:
+            logger.error("Error optimizing geospatial query: %s", e)
             return []
     
     async def cache_frequently_accessed_data(self, db: AsyncSession) -> Dict[str, Any]:
@@ -364,34 +531,22 @@ class PerformanceService:
         try:
             cache_results = {}
             
-            # Cache active meetings
-            active_meetings = await db.execute(
-                text("SELECT * FROM meetings WHERE is_active = true ORDER BY created_at DESC LIMIT 100")
-            )
-            cache_results["active_meetings"] = len(active_meetings.fetchall())
-            
-            # Cache recent sessions
-            recent_sessions = await db.execute(
-                text("SELECT * FROM sessions WHERE created_at > NOW() - INTERVAL '7 days'")
-            )
-            cache_results["recent_sessions"] = len(recent_sessions.fetchall())
-            
-            # Cache user statistics
-            user_stats = await db.execute(
-                text("""
-                    SELECT 
-                        COUNT(*) as total_users,
-                        COUNT(CASE WHEN consent_granted = true THEN 1 END) as consented_users
-                    FROM contacts
-                """)
-            )
-            cache_results["user_stats"] = user_stats.fetchone()._asdict()
+            # All counts come from one statement: one round trip and one
+            # snapshot, with only the totals crossing the wire
+            result = await db.execute(ACCESS_SUMMARY_QUERY)
+            row = result.mappings().one()
+            cache_results["active_meetings"] = row["active_meetings"]
+            cache_results["recent_sessions"] = row["recent_sessions"]
+            cache_results["user_stats"] = {
+                "total_users": row["total_users"],
+                "consented_users": row["consented_users"]
+            }
             
             logger.info("Frequently accessed data cached")
             return cache_results
             
-        except Exception as e:
-            logger.error(f"Error caching data: {e}")
+        except SQLAlchemyError as e:
+            logger.error("Error caching data: %s", e)
             return {"error": str(e)}
     
     async def monitor_performance_metrics(self, db: AsyncSession) -> Dict[str, Any]:
@@ -400,94 +555,50 @@ class PerformanceService:
             metrics = {}
             
             # Database connection metrics
-            pool_stats = {
-                "size": db.bind.pool.size(),
-                "checked_in": db.bind.pool.checkedin(),
-                "checked_out": db.bind.pool.checkedout(),
-                "overflow": db.bind.pool.overflow(),
-                "invalid": db.bind.pool.invalid()
-            }
+            pool_stats = self._get_pool_stats(db)
             metrics["database_pool"] = pool_stats
             
-            # Query performance metrics
-            query_metrics = await self._get_query_metrics(db)
+            # Statement metrics and the catalog snapshot are independent reads
+            query_metrics, snapshot = await asyncio.gather(
+                self._cached_query("query_metrics", self._get_query_metrics),
+                self._cached_query("catalog_snapshot", self._get_catalog_snapshot)
+            )
             metrics["query_performance"] = query_metrics
-            
-            # Table statistics
-            table_stats = await self._get_table_statistics(db)
-            metrics["table_statistics"] = table_stats
-            
-            # Index usage
-            index_stats = await self._get_index_usage(db)
-            metrics["index_usage"] = index_stats
+            metrics["table_sizes"] = snapshot.get("table_sizes", {})
+            metrics["table_statistics"] = snapshot.get("table_statistics", {})
+            metrics["index_usage"] = snapshot.get("index_usage", {})
             
             return metrics
             
-        except Exception as e:
-            logger.error(f"Error monitoring performance metrics: {e}")
+        except SQLAlchemyError as e:
+            logger.error("Error monitoring performance metrics: %s", e)
             return {"error": str(e)}
     
     async def _get_query_metrics(self, db: AsyncSession) -> Dict[str, Any]:
         """Get query performance metrics"""
         try:
-            query = text("""
-                SELECT 
-                    COUNT(*) as total_queries,
-                    AVG(mean_time) as avg_query_time,
-                    MAX(mean_time) as max_query_time,
-                    SUM(calls) as total_calls
-                FROM pg_stat_statements
-            """)
+            result = await db.execute(QUERY_METRICS_QUERY, {"min_calls": self.slow_query_min_calls})
+            # The aggregate always yields exactly one row named like the report
+            return dict(result.mappings().one())
             
-            result = await db.execute(query)
-            row = result.fetchone()
-            
-            return {
-                "total_queries": row.total_queries,
-                "avg_query_time": row.avg_query_time,
-                "max_query_time": row.max_query_time,
-                "total_calls": row.total_calls
-            }
-            
-        except Exception as e:
-            logger.error(f"Error getting query metrics: {e}")
+        except SQLAlchemyError as e:
+            logger.error("Error getting query metrics: %s", e)
             return {}
     
-    async def _get_table_statistics(self, db: AsyncSession) -> Dict[str, Any]:
-        """Get table statistics"""
+    async def _get_catalog_snapshot(self, db: AsyncSession) -> Dict[str, Any]:
+        """Get table sizes, table statistics and index usage in one query"""
         try:
-            query = text("""
-                SELECT 
-                    schemaname,
-                    tablename,
-                    n_tup_ins as inserts,
-                    n_tup_upd as updates,
-                    n_tup_del as deletes,
-                    n_live_tup as live_tuples,
-                    n_dead_tup as dead_tuples
-                FROM pg_stat_user_tables
-                ORDER BY n_live_tup DESC
-            """)
-            
-            result = await db.execute(query)
-            rows = result.fetchall()
+            result = await db.execute(CATALOG_SNAPSHOT_QUERY)
+            snapshot = result.scalar()
             
             return {
-                "tables": [
-                    {
-                        "table": row.tablename,
-                        "inserts": row.inserts,
-                        "updates": row.updates,
-                        "deletes": row.deletes,
-                        "live_tuples": row.live_tuples,
-                        "dead_tuples": row.dead_tuples
-                    }
-                    for row in rows
-                ]
+                "table_sizes": snapshot["table_sizes"],
+                "table_statistics": {"tables": snapshot["tables"]},
+                "index_usage": {"indexes": snapshot["indexes"]}
             }
             
-        except Exception as e:
-            logger.error(f"Error getting table statistics: {e}")
+        except SQLAlchemyError as e:
+            logger.error("Error getting catalog snapshot: %s", e)
             return {}
     
     async def cleanup_old_data(self, db: AsyncSession, days_old: int = 90) -> Dict[str, int]:
@@ -497,31 +608,31 @@ class PerformanceService:
             
             # Clean up old session events
             old_events = await db.execute(
-                text("DELETE FROM session_events WHERE created_at < NOW() - INTERVAL ':days days'"),
-                {"days": days_old}
+                text("DELETE FROM session_events WHERE created_at < NOW() - make_interval(days => :days)"),
+                {"days": int(days_old)}
             )
             cleanup_stats["old_events_deleted"] = old_events.rowcount
             
             # Clean up old sessions
             old_sessions = await db.execute(
-                text("DELETE FROM sessions WHERE created_at < NOW() - INTERVAL ':days days' AND status = 'completed'"),
-                {"days": days_old}
+                text("DELETE FROM sessions WHERE created_at < NOW() - make_interval(days => :days) AND status = 'completed'"),
+                {"days": int(days_old)}
             )
             cleanup_stats["old_sessions_deleted"] = old_sessions.rowcount
             
             # Clean up old meetings
             old_meetings = await db.execute(
-                text("DELETE FROM meetings WHERE created_at < NOW() - INTERVAL ':days days' AND is_active = false"),
-                {"days": days_old}
+                text("DELETE FROM meetings WHERE created_at < NOW() - make_interval(days => :days) AND is_active = false"),
+                {"days": int(days_old)}
             )
             cleanup_stats["old_meetings_deleted"] = old_meetings.rowcount
             
             await db.commit()
             
-            logger.info(f"Cleanup completed: {cleanup_stats}")
+            logger.info("Cleanup completed: %s", cleanup_stats)
             return cleanup_stats
             
-        except Exception as e:
-            logger.error(f"Error cleaning up old data: {e}")
+        except SQLAlchemyError as e:
+            logger.error("Error cleaning up old data: %s", e)
             await db.rollback()
             return {"error": str(e)}
@@ -7,23 +7,55 @@ from datetime import datetime, timedelta
 from typing import Optional, List, Dict, Any, Union
 from uuid import UUID
 
-from sqlalchemy import select, and_, or_, func
+from sqlalchemy import bindparam, select, update, and_, or_, func, case
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
 
 from app.models.session import Session, SessionStatus
 from app.models.session_event import SessionEvent, EventType
 from app.models.meeting import Meeting
 from app.models.contact import Contact
+from app.services.activity_metrics import SessionActivityCounters
 from app.services.location_service import LocationService, LocationData, ProximityResult
 
 logger = logging.getLogger(__name__)
 
+# Hot statements are built once and reused; values are bound per call
+ACTIVE_STATUSES = [SessionStatus.ACTIVE, SessionStatus.CHECKED_IN]
+
+ACTIVE_SESSION_QUERY = select(Session).where(
+    and_(
+        Session.contact_id == bindparam("contact_id"),
+        Session.status.in_(ACTIVE_STATUSES)
+    )
+)
+
+SESSION_WITH_MEETING_QUERY = (
+    select(Session, Meeting)
+    .outerjoin(Meeting, Meeting.id == Session.meeting_id)
+    .where(Session.id == bindparam("session_id"))
+)
+
+SESSION_DETAILS_QUERY = (
+    select(Session)
+    .options(joinedload(Session.meeting), selectinload(Session.events))
+    .where(Session.id == bindparam("session_id"))
+)
+
+
+def _epoch_seconds(column, dialect_name: str):
+    """SQL expression for a timestamp column as epoch seconds"""
+    if dialect_name == "sqlite":
+        return (func.julianday(column) - 2440587.5) * 86400.0
+    return func.extract("epoch", column)
+
 
 class SessionService:
     """Service for managing attendance sessions"""
     
     def __init__(self):
         self.location_service = LocationService()
+        self.activity_counters = SessionActivityCounters()
     
     async def create_session(
         self,
@@ -34,31 +66,19 @@ class SessionService:
     ) -> Optional[Session]:
         """Create a new attendance session"""
         try:
-            # Verify meeting exists and is active
+            # Verify meeting exists and is active with a single primary key
+            # lookup, served from the identity map when already loaded
             # Meeting.id is a String, not UUID
             meeting_str_id = str(meeting_id)
-            meeting_result = await db.execute(
-                select(Meeting).where(
-                    and_(
-                        Meeting.id == meeting_str_id,
-                        Meeting.is_active == True
-                    )
-                )
-            )
-            meeting = meeting_result.scalar_one_or_none()
+            meeting = await db.get(Meeting, meeting_str_id)
             
             if not meeting:
-                # Check if meeting exists but is inactive
-                inactive_result = await db.execute(
-                    select(Meeting).where(Meeting.id == meeting_str_id)
-                )
-                inactive_meeting = inactive_result.scalar_one_or_none()
-                if inactive_meeting:
-                    logger.warning(f"Meeting {meeting_id} exists but is inactive")
-                    raise ValueError(f"Meeting {meeting_id} is not active")
-                else:
-                    logger.warning(f"Meeting {meeting_id} not found")
-                    raise ValueError(f"Meeting {meeting_id} not found")
+                logger.warning(f"Meeting {meeting_id} not found")
+                raise ValueError(f"Meeting {meeting_id} not found")
+            
+            if not meeting.is_active:
+                logger.warning(f"Meeting {meeting_id} exists but is inactive")
+                raise ValueError(f"Meeting {meeting_id} is not active")
             
             # Check for existing active session
             existing_session = await self.get_active_session(str(contact_id), db)
@@ -69,12 +89,11 @@ class SessionService:
                     f"New session requested for meeting {meeting_str_id}. "
                     f"Ending existing session and creating new one."
                 )
-                # End the existing session before creating a new one
+                # End the existing session; the update is committed together
+                # with the new session below
                 existing_session.status = SessionStatus.ENDED
                 existing_session.is_complete = True
-                await db.commit()
-                await db.refresh(existing_session)
-                logger.info(f"Ended existing session {existing_session.id} to create new session")
+                logger.info(f"Ending existing session {existing_session.id} to create new session")
             
             # Create new session
             # Session IDs are strings
@@ -94,6 +113,7 @@ class SessionService:
             await db.refresh(session)
             
             logger.info(f"Created session {session.id} for contact {contact_id} at meeting {meeting_str_id}")
+            self.activity_counters.record_in_background()
             return session
             
         except ValueError as e:
@@ -104,6 +124,7 @@ class SessionService:
         except Exception as e:
             logger.error(f"Error creating session: {e}", exc_info=True)
             await db.rollback()
+            self.activity_counters.record_in_background(failed=True)
             raise RuntimeError(f"Failed to create session: {str(e)}")
     
     async def create_general_session(
@@ -140,11 +161,13 @@ class SessionService:
             await db.refresh(session)
             
             logger.info(f"Created general session {session.id} for contact {contact_id}")
+            self.activity_counters.record_in_background()
             return session
             
         except Exception as e:
             logger.error(f"Error creating general session: {e}", exc_info=True)
             await db.rollback()
+            self.activity_counters.record_in_background(failed=True)
             raise RuntimeError(f"Failed to create general session: {str(e)}")
     
     async def check_in(
@@ -156,26 +179,23 @@ class SessionService:
     ) -> Optional[SessionEvent]:
         """Check in to a session with GPS verification"""
         try:
-            # Get session details
+            # Session and its meeting (for radius check and test mode
+            # detection) in one round trip
             session_result = await db.execute(
-                select(Session).where(Session.id == str(session_id))
+                SESSION_WITH_MEETING_QUERY, {"session_id": str(session_id)}
             )
-            session = session_result.scalar_one_or_none()
+            row = session_result.one_or_none()
             
-            if not session:
+            if not row:
                 logger.warning(f"Session {session_id} not found")
                 return None
             
+            session, meeting = row
+            
             if session.status != SessionStatus.ACTIVE:
                 logger.warning(f"Session {session_id} is not active (status: {session.status})")
                 return None
             
-            # Get meeting for radius check and test mode detection
-            meeting_result = await db.execute(
-                select(Meeting).where(Meeting.id == str(session.meeting_id))
-            )
-            meeting = meeting_result.scalar_one_or_none()
-            
             if not meeting:
                 logger.warning(f"Meeting {session.meeting_id} not found for session {session_id}")
                 return None
@@ -186,7 +206,8 @@ class SessionService:
                 location_data.longitude,
                 str(session.meeting_id),
                 db,
-                location_data.accuracy
+                location_data.accuracy,
+                meeting=meeting
             )
             
             # For AYA Demo Meet or large-radius meetings, be extra lenient (testing)
@@ -220,7 +241,8 @@ class SessionService:
                 location_data=location_data,
                 meeting_id=str(session.meeting_id),
                 notes=notes,
-                db=db
+                db=db,
+                meeting=meeting
             )
             
             if event:
@@ -247,16 +269,18 @@ class SessionService:
     ) -> Optional[SessionEvent]:
         """Check out of a session with GPS verification"""
         try:
-            # Get session details
+            # Session and its meeting in one round trip
             session_result = await db.execute(
-                select(Session).where(Session.id == session_id)
+                SESSION_WITH_MEETING_QUERY, {"session_id": str(session_id)}
             )
-            session = session_result.scalar_one_or_none()
+            row = session_result.one_or_none()
             
-            if not session:
+            if not row:
                 logger.warning(f"Session {session_id} not found")
                 return None
             
+            session, meeting = row
+            
             if session.status != SessionStatus.CHECKED_IN:
                 logger.warning(f"Session {session_id} is not checked in (status: {session.status})")
                 return None
@@ -267,7 +291,8 @@ class SessionService:
                 location_data.longitude,
                 str(session.meeting_id),
                 db,
-                location_data.accuracy
+                location_data.accuracy,
+                meeting=meeting
             )
             
             if not proximity_result.is_within_range:
@@ -284,7 +309,8 @@ class SessionService:
                 location_data=location_data,
                 meeting_id=str(session.meeting_id),
                 notes=notes,
-                db=db
+                db=db,
+                meeting=meeting
             )
             
             if event:
@@ -310,15 +336,7 @@ class SessionService:
         """Get active session for a contact"""
         try:
             result = await db.execute(
-                select(Session).where(
-                    and_(
-                        Session.contact_id == str(contact_id),
-                        Session.status.in_([
-                            SessionStatus.ACTIVE,
-                            SessionStatus.CHECKED_IN
-                        ])
-                    )
-                )
+                ACTIVE_SESSION_QUERY, {"contact_id": str(contact_id)}
             )
             return result.scalar_one_or_none()
         except Exception as e:
@@ -370,28 +388,17 @@ class SessionService:
     ) -> Optional[Dict[str, Any]]:
         """Get detailed session information with events"""
         try:
-            # Get session
+            # Session and meeting in one joined query, events in one more
             session_result = await db.execute(
-                select(Session).where(Session.id == session_id)
+                SESSION_DETAILS_QUERY, {"session_id": str(session_id)}
             )
             session = session_result.scalar_one_or_none()
             
             if not session:
                 return None
             
-            # Get session events
-            events_result = await db.execute(
-                select(SessionEvent)
-                .where(SessionEvent.session_id == session_id)
-                .order_by(SessionEvent.ts_server)
-            )
-            events = events_result.scalars().all()
-            
-            # Get meeting details
-            meeting_result = await db.execute(
-                select(Meeting).where(Meeting.id == session.meeting_id)
-            )
-            meeting = meeting_result.scalar_one_or_none()
+            meeting = session.meeting
+            events = session.events
             
             return {
                 "session": {
@@ -445,19 +452,29 @@ class SessionService:
     ) -> bool:
         """End a session manually"""
         try:
-            session_result = await db.execute(
-                select(Session).where(Session.id == session_id)
+            # Update in place without loading the row first; an empty note
+            # becomes just the end reason, otherwise the reason is appended.
+            # check_out_time is derived from session events, not a column.
+            # RETURNING refreshes a session already in the identity map, so
+            # callers holding it see the new status and notes.
+            ended_note = f"Ended: {reason}"
+            result = await db.execute(
+                update(Session)
+                .where(Session.id == session_id)
+                .values(
+                    status=SessionStatus.ENDED,
+                    session_notes=case(
+                        (func.coalesce(Session.session_notes, "") == "", ended_note),
+                        else_=Session.session_notes + f"\n{ended_note}"
+                    )
+                )
+                .returning(Session)
+                .execution_options(populate_existing=True)
             )
-            session = session_result.scalar_one_or_none()
             
-            if not session:
+            if result.scalar_one_or_none() is None:
                 return False
             
-            # Update session status
-            session.status = SessionStatus.ENDED
-            session.check_out_time = datetime.utcnow()
-            session.session_notes = f"{session.session_notes or ''}\nEnded: {reason}".strip()
-            
             await db.commit()
             
             logger.info(f"Session {session_id} ended: {reason}")
@@ -484,52 +501,58 @@ class SessionService:
             if end_date:
                 date_filter = and_(date_filter, Session.created_at <= end_date)
             
-            # Get session counts by status
-            result = await db.execute(
+            # Check-in and check-out times live on the session events
+            event_times = (
                 select(
-                    Session.status,
-                    func.count(Session.id).label('count')
+                    SessionEvent.session_id,
+                    func.min(
+                        case((SessionEvent.type == EventType.CHECK_IN, SessionEvent.ts_client))
+                    ).label("check_in_time"),
+                    func.min(
+                        case((SessionEvent.type == EventType.CHECK_OUT, SessionEvent.ts_client))
+                    ).label("check_out_time")
                 )
-                .where(date_filter)
-                .group_by(Session.status)
+                .group_by(SessionEvent.session_id)
+                .subquery()
             )
-            
-            status_counts = {row.status.value: row.count for row in result}
-            
-            # Get total sessions
-            total_result = await db.execute(
-                select(func.count(Session.id)).where(date_filter)
+            dialect_name = db.get_bind().dialect.name
+            duration_seconds = (
+                _epoch_seconds(event_times.c.check_out_time, dialect_name)
+                - _epoch_seconds(event_times.c.check_in_time, dialect_name)
             )
-            total_sessions = total_result.scalar() or 0
             
-            # Get average session duration
-            completed_sessions = await db.execute(
-                select(Session)
-                .where(
-                    and_(
-                        date_filter,
-                        Session.status == SessionStatus.COMPLETED,
-                        Session.check_in_time.isnot(None),
-                        Session.check_out_time.isnot(None)
-                    )
+            # Counts and durations per status in one aggregate query; the
+            # duration is NULL unless both events exist
+            result = await db.execute(
+                select(
+                    Session.status,
+                    func.count(Session.id).label("count"),
+                    func.count(duration_seconds).label("timed"),
+                    func.avg(duration_seconds).label("avg_duration")
                 )
+                .outerjoin(event_times, event_times.c.session_id == Session.id)
+                .where(date_filter)
+                .group_by(Session.status)
             )
             
-            completed = completed_sessions.scalars().all()
-            total_duration = sum([
-                (s.check_out_time - s.check_in_time).total_seconds()
-                for s in completed
-            ])
+            status_counts = {}
+            completed_count = 0
+            avg_duration_seconds = 0
+            for row in result:
+                # Statuses outside SessionStatus are counted under their
+                # stored value rather than failing the whole report
+                status_counts[row.status] = row.count
+                if row.status == SessionStatus.COMPLETED:
+                    completed_count = row.timed
+                    avg_duration_seconds = row.avg_duration or 0
             
-            avg_duration_minutes = (
-                total_duration / len(completed) / 60
-                if completed else 0
-            )
+            total_sessions = sum(status_counts.values())
+            avg_duration_minutes = float(avg_duration_seconds) / 60
             
             return {
                 "total_sessions": total_sessions,
                 "status_breakdown": status_counts,
-                "completed_sessions": len(completed),
+                "completed_sessions": completed_count,
                 "average_duration_minutes": round(avg_duration_minutes, 2),
                 "date_range": {
                     "start": start_date.isoformat() if start_date else None,
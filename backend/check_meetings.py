@@ -1,21 +1,22 @@
 import asyncio
-from app.core.database import get_db
 from app.models.meeting import Meeting
-from sqlalchemy import select
+from sqlalchemy import func, select
 
-async def check_meetings():
-    async for db in get_db():
-        result = await db.execute(select(Meeting))
-        meetings = result.scalars().all()
-        print(f'Total meetings in database: {len(meetings)}')
-        if len(meetings) > 0:
+async def check_meetings(async_session):
+    async with async_session() as db:
+        # Count on the server and fetch only the rows that are printed
+        total = await db.scalar(select(func.count(Meeting.id)))
+        print(f'Total meetings in database: {total}')
+        if total > 0:
+            result = await db.execute(select(Meeting).limit(5))
+            meetings = result.scalars().all()
             print(f'\nFirst 5 meetings:')
-            for i, meeting in enumerate(meetings[:5], 1):
+            for i, meeting in enumerate(meetings, 1):
                 print(f'  {i}. {meeting.name} - {meeting.address} (Active: {meeting.is_active})')
-        break
 
 if __name__ == "__main__":
-    asyncio.run(check_meetings())
+    from admin_tools import run
+    asyncio.run(run([check_meetings], pooled=False))
 
 
 
@@ -9,26 +9,14 @@ from pathlib import Path
 # Add the app directory to the path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
 from sqlalchemy import select
 
 from app.models.contact import Contact
-from app.core.config import settings
-from app.core.database import create_engine_with_pool_config
 
 
-async def create_admin_user():
+async def create_admin_user(async_session):
     """Create an admin user in the database"""
     
-    # Create engine using the same method as the app
-    engine = create_engine_with_pool_config()
-    
-    # Create session
-    async_session = sessionmaker(
-        engine, class_=AsyncSession, expire_on_commit=False
-    )
-    
     async with async_session() as session:
         try:
             # Check if admin user already exists
@@ -81,10 +69,9 @@ async def create_admin_user():
             print(f"❌ Error creating admin user: {e}")
             await session.rollback()
             raise
-        finally:
-            await engine.dispose()
 
 
 if __name__ == "__main__":
-    asyncio.run(create_admin_user())
+    from admin_tools import run
+    asyncio.run(run([create_admin_user], pooled=False))
 
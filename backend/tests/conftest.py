@@ -133,6 +133,78 @@ def mock_redis():
     return AsyncMock()
 
 
+class FakeRedis:
+    """In-memory stand-in for the redis.asyncio commands the services use"""
+    
+    def __init__(self):
+        self.values = {}
+        self.zsets = {}
+        self.ttls = {}
+    
+    async def incr(self, key):
+        self.values[key] = str(int(self.values.get(key, 0)) + 1)
+        return int(self.values[key])
+    
+    async def expire(self, key, seconds):
+        self.ttls[key] = seconds
+        return True
+    
+    async def mget(self, keys):
+        return [self.values.get(key) for key in keys]
+    
+    async def zadd(self, key, mapping):
+        zset = self.zsets.setdefault(key, {})
+        added = sum(member not in zset for member in mapping)
+        zset.update({member: float(score) for member, score in mapping.items()})
+        return added
+    
+    async def zrem(self, key, *members):
+        zset = self.zsets.get(key, {})
+        removed = sum(zset.pop(member, None) is not None for member in members)
+        if not zset:
+            self.zsets.pop(key, None)
+        return removed
+    
+    async def zcard(self, key):
+        return len(self.zsets.get(key, {}))
+    
+    async def zrevrange(self, key, start, end, withscores=False):
+        items = sorted(self.zsets.get(key, {}).items(), key=lambda item: (item[1], item[0]), reverse=True)
+        items = items[start:None if end == -1 else end + 1]
+        return items if withscores else [member for member, _ in items]
+    
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    """Queues FakeRedis commands until execute, like a redis pipeline"""
+    
+    def __init__(self, redis_client):
+        self.redis_client = redis_client
+        self.commands = []
+    
+    def __getattr__(self, name):
+        command = getattr(self.redis_client, name)
+        return lambda *args, **kwargs: self.commands.append((command, args, kwargs))
+    
+    async def execute(self):
+        commands, self.commands = self.commands, []
+        return [await command(*args, **kwargs) for command, args, kwargs in commands]
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+@pytest.fixture
+def fake_redis():
+    """Create in-memory Redis stand-in"""
+    return FakeRedis()
+
+
 @pytest.fixture
 def mock_ghl_service():
     """Create mock GHL service"""
@@ -0,0 +1,97 @@
+"""
+Session activity counter tests against an in-memory Redis stand-in
+"""
+
+import asyncio
+
+import pytest
+from datetime import datetime, timedelta
+
+import app.services.activity_metrics as activity_metrics
+from app.services.activity_metrics import SessionActivityCounters
+
+
+NOW = datetime(2024, 11, 1, 10, 30, 45)
+
+
+class FrozenDatetime(datetime):
+    """datetime whose utcnow is fixed, so buckets do not roll over mid-test"""
+    
+    @classmethod
+    def utcnow(cls):
+        return NOW
+
+
+class TestSessionActivityCounters:
+    """Minute bucket counter tests"""
+    
+    @pytest.fixture
+    def counters(self, fake_redis, monkeypatch):
+        """Create counters bound to the fake Redis at a fixed time"""
+        monkeypatch.setattr(activity_metrics, "datetime", FrozenDatetime)
+        counters = SessionActivityCounters()
+        counters.redis_client = fake_redis
+        return counters
+    
+    @pytest.mark.asyncio
+    async def test_record_increments_minute_buckets_with_expiry(self, counters, fake_redis):
+        """Test record INCRs the current minute's buckets and sets their TTL"""
+        await counters.record()
+        await counters.record()
+        await counters.record(failed=True)
+        
+        total_key = "session_activity:total:202411011030"
+        failed_key = "session_activity:failed:202411011030"
+        assert fake_redis.values == {total_key: "3", failed_key: "1"}
+        assert fake_redis.ttls == {
+            total_key: counters.bucket_ttl_seconds,
+            failed_key: counters.bucket_ttl_seconds
+        }
+    
+    @pytest.mark.asyncio
+    async def test_record_in_background_does_not_wait(self, counters, fake_redis):
+        """Test background records return at once and still land in the bucket"""
+        counters.record_in_background()
+        counters.record_in_background(failed=True)
+        
+        # Nothing has run yet; the caller was not held up
+        assert fake_redis.values == {}
+        
+        await asyncio.gather(*counters._pending)
+        
+        assert fake_redis.values == {
+            "session_activity:total:202411011030": "2",
+            "session_activity:failed:202411011030": "1"
+        }
+        assert counters._pending == set()
+    
+    @pytest.mark.asyncio
+    async def test_get_window_reads_sixty_buckets_newest_first(self, counters, fake_redis):
+        """Test get_window returns one value per minute and sums across the hour"""
+        await counters.record()
+        await counters.record(failed=True)
+        
+        # Earlier buckets inside the window, and one just outside it
+        for minutes_ago, total, failed in [(1, 4, 1), (30, 2, 0), (59, 5, 2), (60, 7, 7)]:
+            moment = NOW - timedelta(minutes=minutes_ago)
+            fake_redis.values[counters._bucket_key("total", moment)] = str(total)
+            fake_redis.values[counters._bucket_key("failed", moment)] = str(failed)
+        
+        window = await counters.get_window(60)
+        
+        assert len(window["total"]) == 60
+        assert len(window["failed"]) == 60
+        assert window["total"][:2] == [2, 4]
+        assert window["total"][59] == 5
+        assert sum(window["total"]) == 2 + 4 + 2 + 5
+        assert sum(window["failed"]) == 1 + 1 + 0 + 2
+    
+    @pytest.mark.asyncio
+    async def test_get_window_without_redis(self, monkeypatch):
+        """Test get_window returns None when Redis is unavailable"""
+        async def no_redis():
+            return None
+        
+        monkeypatch.setattr(activity_metrics, "get_redis", no_redis)
+        
+        assert await SessionActivityCounters().get_window(60) is None
@@ -9,8 +9,12 @@ from datetime import datetime
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy import text
+from geopy.distance import geodesic
 
-from app.services.location_service import LocationService, LocationData, ProximityResult
+from app.services.location_service import (
+    LocationService, LocationData, ProximityResult, MeetingKernel,
+    meeting_kernel, KERNEL_CACHE_SIZE
+)
 from app.models.base import Base
 from app.models.meeting import Meeting
 from app.models.contact import Contact
@@ -339,6 +343,57 @@ class TestLocationServiceReal:
         )
         assert distance == 0.0
     
+    def test_meeting_kernel_matches_geodesic_real(self, real_location_service):
+        """Test specialized meeting kernel against the geodesic distance"""
+        kernel = MeetingKernel.build(40.7128, -74.0060)
+        
+        assert kernel(40.7128, -74.0060) == 0.0
+        
+        # Short range (meeting radius scale) and long range (NYC to Philadelphia)
+        for lat, lng in [(40.7135, -74.0050), (39.9526, -75.1652)]:
+            expected = real_location_service.calculate_distance(40.7128, -74.0060, lat, lng)
+            assert abs(kernel(lat, lng) - expected) / expected < 0.005
+    
+    def test_meeting_kernel_cache_real(self, real_location_service):
+        """Test kernels are shared per anchor and rebuilt when a meeting moves"""
+        kernel = meeting_kernel(40.7128, -74.0060)
+        assert meeting_kernel(40.7128, -74.0060) is kernel
+        
+        # Moving the meeting misses the cache and builds a new anchor
+        moved_kernel = meeting_kernel(39.9526, -74.0060)
+        assert moved_kernel is not kernel
+        assert moved_kernel(39.9526, -74.0060) == 0.0
+        assert meeting_kernel.cache_info().maxsize == KERNEL_CACHE_SIZE
+    
+    @pytest.mark.asyncio
+    async def test_verify_location_boundary_matches_calculate_distance_real(self, real_location_service):
+        """Test verify_location and calculate_distance agree at the radius"""
+        meeting = Meeting(
+            name="Boundary Meeting",
+            address="1 Boundary St",
+            lat=40.7128,
+            lng=-74.0060,
+            radius_meters=100
+        )
+        
+        for bearing in (0, 45, 90, 180, 270):
+            for offset in (-0.05, 0.05):
+                point = geodesic(meters=100 + offset).destination((meeting.lat, meeting.lng), bearing)
+                expected = real_location_service.calculate_distance(
+                    meeting.lat, meeting.lng, point.latitude, point.longitude
+                )
+                
+                result = await real_location_service.verify_location(
+                    user_lat=point.latitude,
+                    user_lng=point.longitude,
+                    meeting_id=str(meeting.id),
+                    db=None,
+                    meeting=meeting
+                )
+                
+                assert result.is_within_range == (expected <= 100)
+                assert abs(result.distance_meters - expected) < 1e-6
+    
     def test_calculate_accuracy_confidence_real(self, real_location_service):
         """Test real accuracy confidence calculation"""
         # Test with good accuracy
@@ -10,6 +10,7 @@ from uuid import uuid4
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy import text
+from geopy.distance import geodesic
 
 from app.services.meeting_service import MeetingService
 from app.models.base import Base
@@ -491,4 +492,172 @@ class TestMeetingServiceReal:
                 {"meeting_id": meeting.id}
             )
             db_meeting = result.fetchone()
-            assert db_meeting is None
\ No newline at end of file
+            assert db_meeting is None
+    async def _add_meetings(self, db, points):
+        """Store one active meeting per (name, lat, lng) point"""
+        meetings = [
+            Meeting(
+                name=name,
+                address=f"{name} address",
+                lat=lat,
+                lng=lng,
+                radius_meters=100,
+                is_active=True
+            )
+            for name, lat, lng in points
+        ]
+        db.add_all(meetings)
+        await db.commit()
+        return meetings
+    
+    @pytest.mark.asyncio
+    async def test_find_nearby_meetings_across_antimeridian_real(self, real_meeting_service, real_database):
+        """Test meetings on the other side of the 180th meridian are found"""
+        async with real_database() as db:
+            await self._add_meetings(db, [
+                ("East", 0.0, 179.999),
+                ("West", 0.0, -179.999),
+                ("Far", 0.0, 179.0),
+            ])
+            
+            nearby = await real_meeting_service.find_nearby_meetings(
+                user_lat=0.0, user_lng=179.9995, radius_km=1.0, db=db
+            )
+            assert sorted(m["name"] for m in nearby) == ["East", "West"]
+            
+            nearby = await real_meeting_service.find_nearby_meetings(
+                user_lat=0.0, user_lng=-179.9995, radius_km=1.0, db=db
+            )
+            assert sorted(m["name"] for m in nearby) == ["East", "West"]
+    
+    @pytest.mark.asyncio
+    async def test_find_nearby_meetings_near_poles_real(self, real_meeting_service, real_database):
+        """Test meetings across a pole are found at every longitude"""
+        async with real_database() as db:
+            await self._add_meetings(db, [
+                ("North 0", 89.9995, 0.0),
+                ("North 90", 89.9995, 90.0),
+                ("North 180", 89.9995, 180.0),
+                ("South", -89.9995, 45.0),
+            ])
+            
+            nearby = await real_meeting_service.find_nearby_meetings(
+                user_lat=89.9995, user_lng=-90.0, radius_km=1.0, db=db
+            )
+            assert sorted(m["name"] for m in nearby) == ["North 0", "North 180", "North 90"]
+            
+            nearby = await real_meeting_service.find_nearby_meetings(
+                user_lat=-89.9995, user_lng=-135.0, radius_km=1.0, db=db
+            )
+            assert [m["name"] for m in nearby] == ["South"]
+    
+    @pytest.mark.asyncio
+    async def test_find_nearby_meetings_at_radius_matches_geodesic_real(self, real_meeting_service, real_database):
+        """Test the radius edge is decided by the geodesic that check-in verification uses"""
+        user_lat, user_lng = 40.7128, -74.0060
+        calculate_distance = real_meeting_service.location_service.calculate_distance
+        
+        # Points a few centimetres either side of 1 km, where the spherical
+        # kernel alone disagrees with the geodesic
+        points = []
+        for bearing in (0, 45, 90, 180, 270):
+            for offset in (-0.05, 0.05):
+                point = geodesic(meters=1000 + offset).destination((user_lat, user_lng), bearing)
+                points.append((f"{bearing}:{offset}", point.latitude, point.longitude))
+        
+        async with real_database() as db:
+            await self._add_meetings(db, points)
+            
+            nearby = await real_meeting_service.find_nearby_meetings(
+                user_lat=user_lat, user_lng=user_lng, radius_km=1.0, db=db
+            )
+        
+        expected = sorted(
+            name for name, lat, lng in points
+            if calculate_distance(user_lat, user_lng, lat, lng) <= 1000.0
+        )
+        assert sorted(m["name"] for m in nearby) == expected
+        assert len(expected) == 5
+        for meeting in nearby:
+            assert meeting["distance_meters"] == 999.95
+    
+    @pytest.mark.asyncio
+    async def test_find_nearby_meetings_sorted_by_distance_real(self, real_meeting_service, real_database):
+        """Test results come back nearest first regardless of storage order"""
+        async with real_database() as db:
+            await self._add_meetings(db, [
+                ("Third", 40.7128 + 0.003, -74.0060),
+                ("First", 40.7128 + 0.001, -74.0060),
+                ("Fourth", 40.7128, -74.0060 + 0.005),
+                ("Second", 40.7128 - 0.002, -74.0060),
+            ])
+            
+            nearby = await real_meeting_service.find_nearby_meetings(
+                user_lat=40.7128, user_lng=-74.0060, radius_km=5.0, db=db
+            )
+            
+            assert [m["name"] for m in nearby] == ["First", "Second", "Third", "Fourth"]
+            distances = [m["distance_meters"] for m in nearby]
+            assert distances == sorted(distances)
+    
+    @pytest.mark.asyncio
+    async def test_update_meeting_returns_refreshed_meeting_real(self, real_meeting_service, real_database):
+        """Test update_meeting returns the updated columns and updated_at on the loaded object"""
+        async with real_database() as db:
+            meeting, = await self._add_meetings(db, [("Before", 40.7128, -74.0060)])
+            stale = datetime(2020, 1, 1)
+            await db.execute(
+                text("UPDATE meetings SET updated_at = :stale WHERE id = :meeting_id"),
+                {"stale": stale, "meeting_id": str(meeting.id)}
+            )
+            await db.commit()
+            
+            updated = await real_meeting_service.update_meeting(
+                meeting_id=meeting.id,
+                update_data={"name": "After", "radius_meters": 250, "description": None, "unknown": "x"},
+                db=db
+            )
+            
+            # RETURNING refreshes the object already in the session
+            assert updated is meeting
+            assert updated.name == "After"
+            assert updated.radius_meters == 250
+            assert updated.address == "Before address"
+            assert updated.updated_at.replace(tzinfo=None) > stale
+            
+            stored = (await db.execute(
+                text("SELECT name, radius_meters FROM meetings WHERE id = :meeting_id"),
+                {"meeting_id": str(meeting.id)}
+            )).one()
+            assert tuple(stored) == ("After", 250)
+    
+    @pytest.mark.asyncio
+    async def test_update_meeting_missing_id_returns_none_real(self, real_meeting_service, real_database):
+        """Test update_meeting returns None and writes nothing for a missing id"""
+        async with real_database() as db:
+            meeting, = await self._add_meetings(db, [("Untouched", 40.7128, -74.0060)])
+            
+            updated = await real_meeting_service.update_meeting(
+                meeting_id=uuid4(),
+                update_data={"name": "Changed"},
+                db=db
+            )
+            
+            assert updated is None
+            stored = (await db.execute(
+                text("SELECT name FROM meetings WHERE id = :meeting_id"),
+                {"meeting_id": str(meeting.id)}
+            )).scalar_one()
+            assert stored == "Untouched"
+    
+    @pytest.mark.asyncio
+    async def test_deactivate_meeting_updates_loaded_meeting_real(self, real_meeting_service, real_database):
+        """Test deactivate_meeting is reflected on the loaded object and a missing id returns False"""
+        async with real_database() as db:
+            meeting, = await self._add_meetings(db, [("Active", 40.7128, -74.0060)])
+            
+            assert await real_meeting_service.deactivate_meeting(meeting_id=meeting.id, db=db) == True
+            assert meeting.is_active == False
+            assert meeting.updated_at is not None
+            
+            assert await real_meeting_service.deactivate_meeting(meeting_id=uuid4(), db=db) == False
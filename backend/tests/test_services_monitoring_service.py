@@ -0,0 +1,55 @@
+"""
+Monitoring service alert history tests
+"""
+
+import pytest
+
+from app.services.monitoring_service import Alert, MonitoringService
+
+
+class TestAlertHistory:
+    """Alert deduplication tests"""
+    
+    @pytest.fixture
+    def monitoring_service(self):
+        """Create monitoring service instance"""
+        return MonitoringService()
+    
+    def _alert(self, alert_type, severity, value):
+        """Build an alert over a fixed threshold"""
+        return Alert(alert_type, severity, value, 80.0, "{value}")
+    
+    def test_repeated_alert_refreshes_existing_entry(self, monitoring_service):
+        """Test a rule that stays tripped keeps one history entry with the latest value"""
+        for value in (85.0, 90.0, 95.0):
+            monitoring_service._record_alerts([
+                self._alert("high_cpu_usage", "warning", value),
+                self._alert("low_health_score", "critical", 50.0)
+            ])
+        
+        assert [(a.type, a.severity) for a in monitoring_service.alerts] == [
+            ("high_cpu_usage", "warning"),
+            ("low_health_score", "critical")
+        ]
+        assert monitoring_service.alerts[0].value == 95.0
+    
+    def test_cleared_alert_is_new_when_tripped_again(self, monitoring_service):
+        """Test an alert that clears and trips again is recorded as a new entry"""
+        monitoring_service._record_alerts([self._alert("high_cpu_usage", "warning", 85.0)])
+        monitoring_service._record_alerts([])
+        monitoring_service._record_alerts([self._alert("high_cpu_usage", "warning", 88.0)])
+        
+        assert [a.value for a in monitoring_service.alerts] == [85.0, 88.0]
+    
+    def test_same_rule_at_another_severity_is_separate(self, monitoring_service):
+        """Test alerts are keyed by rule and severity"""
+        monitoring_service._record_alerts([self._alert("high_cpu_usage", "warning", 85.0)])
+        monitoring_service._record_alerts([
+            self._alert("high_cpu_usage", "warning", 86.0),
+            self._alert("high_cpu_usage", "critical", 86.0)
+        ])
+        
+        assert [(a.severity, a.value) for a in monitoring_service.alerts] == [
+            ("warning", 86.0),
+            ("critical", 86.0)
+        ]
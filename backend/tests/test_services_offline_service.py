@@ -0,0 +1,88 @@
+"""
+Offline service queue tests against an in-memory Redis stand-in
+"""
+
+import orjson
+import pytest
+from datetime import datetime
+from uuid import uuid4
+
+import app.services.offline_service as offline_service
+from app.services.offline_service import OfflineOperation, OfflineService
+
+
+class TestOfflineQueueRoundTrip:
+    """Offline queue storage tests"""
+    
+    @pytest.fixture
+    def offline_service(self, fake_redis):
+        """Create offline service bound to the fake Redis"""
+        service = OfflineService()
+        service.redis_client = fake_redis
+        return service
+    
+    @pytest.mark.asyncio
+    async def test_store_load_retry_remove_leaves_queue_empty(self, offline_service, fake_redis):
+        """Test an operation's exact member is tracked through a retry and removed"""
+        user_id = uuid4()
+        queue_key = f"{offline_service.queue_key_prefix}:{user_id}"
+        due_key = f"{offline_service.due_key_prefix}:{user_id}"
+        
+        # Store
+        operation_id = await offline_service.queue_operation(
+            "check_in", {"session_id": str(uuid4())}, user_id, priority=2
+        )
+        assert await fake_redis.zcard(queue_key) == 1
+        
+        # Load
+        operations = await offline_service.get_pending_operations(user_id)
+        assert [op.id for op in operations] == [operation_id]
+        operation = operations[0]
+        assert operation.stored_json in fake_redis.zsets[queue_key]
+        
+        # Retry: the check-in data is incomplete, so the attempt fails and
+        # the operation is rewritten with a backoff
+        success = await offline_service.process_operation(operation, db=None)
+        assert success == False
+        assert operation.retry_count == 1
+        assert operation.next_attempt is not None
+        
+        # The rewritten member replaced the original one
+        assert list(fake_redis.zsets[queue_key]) == [operation.stored_json]
+        assert list(fake_redis.zsets[due_key]) == [operation.stored_json]
+        
+        # Still listed while it backs off
+        operations = await offline_service.get_pending_operations(user_id)
+        assert [(op.id, op.retry_count) for op in operations] == [(operation_id, 1)]
+        
+        # Remove
+        await offline_service._remove_operation(operations[0])
+        
+        assert await fake_redis.zcard(queue_key) == 0
+        assert await fake_redis.zcard(due_key) == 0
+        assert await offline_service.get_pending_operations(user_id) == []
+
+
+class TestOfflineOperationSerialization:
+    """OfflineOperation storage format tests"""
+    
+    def test_from_dict_round_trip_skips_init(self, monkeypatch):
+        """Test from_dict restores every field without minting a new id or timestamp"""
+        operation = OfflineOperation("check_in", {"session_id": "s-1"}, uuid4(), priority=3, max_retries=5)
+        # Stored timestamps keep microseconds
+        operation.created_at = datetime(2024, 11, 1, 9, 59, 30, 123456)
+        operation.retry_count = 2
+        operation.last_attempt = datetime(2024, 11, 1, 10, 0, 0)
+        operation.next_attempt = datetime(2024, 11, 1, 10, 5, 0)
+        operation.status = "failed"
+        
+        def fail(*args, **kwargs):
+            raise AssertionError("from_dict must not run __init__")
+        
+        monkeypatch.setattr(offline_service, "uuid4", fail)
+        restored = OfflineOperation.from_dict(orjson.loads(operation.to_json()))
+        
+        assert restored.to_dict() == operation.to_dict()
+        assert restored.user_id == operation.user_id
+        assert restored.created_at == operation.created_at
+        assert restored.stored_json is None
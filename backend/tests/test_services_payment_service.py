@@ -0,0 +1,83 @@
+"""
+Payment service tests for payment history pagination
+"""
+
+import base64
+
+import pytest
+
+from app.core.exceptions import ValidationError
+from app.services.payment_service import PaymentService
+
+
+class TestPaymentHistoryPagination:
+    """Payment history keyset cursor tests"""
+    
+    @pytest.fixture
+    def payment_service(self):
+        """Create payment service instance"""
+        return PaymentService(db=None)
+    
+    def test_cursor_round_trip(self, payment_service):
+        """Test following next_cursor walks every payment exactly once"""
+        full = payment_service.get_payment_history("user-1", limit=50)
+        
+        seen = []
+        cursor = None
+        while True:
+            page = payment_service.get_payment_history("user-1", limit=1, cursor=cursor)
+            assert page["success"] == True
+            assert page["count"] == len(page["payments"]) == 1
+            seen.extend(payment["payment_id"] for payment in page["payments"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        
+        assert seen == [payment["payment_id"] for payment in full["payments"]]
+        assert len(set(seen)) == full["total"]
+    
+    def test_last_page_has_no_cursor(self, payment_service):
+        """Test a page that reaches the end returns no next_cursor"""
+        result = payment_service.get_payment_history("user-1", limit=50)
+        
+        assert result["count"] == result["total"]
+        assert result["next_cursor"] is None
+        
+        # Paging up to the last row ends with a cursor-less final page
+        first = payment_service.get_payment_history("user-1", limit=result["total"] - 1)
+        last = payment_service.get_payment_history("user-1", limit=1, cursor=first["next_cursor"])
+        assert last["count"] == 1
+        assert last["next_cursor"] is None
+    
+    @pytest.mark.parametrize("cursor", [
+        "not-base64!",
+        base64.urlsafe_b64encode(b"no-separator").decode(),
+        base64.urlsafe_b64encode(b"not-a-time|pi_123").decode(),
+        base64.urlsafe_b64encode(b"1730455200000|").decode(),
+    ])
+    def test_malformed_cursor_raises_validation_error(self, payment_service, cursor):
+        """Test malformed cursors are rejected as validation errors"""
+        with pytest.raises(ValidationError):
+            payment_service.get_payment_history("user-1", limit=1, cursor=cursor)
+    
+    def test_deprecated_offset(self, payment_service):
+        """Test the deprecated offset still pages, and a cursor takes precedence"""
+        full = payment_service.get_payment_history("user-1", limit=50)
+        
+        result = payment_service.get_payment_history("user-1", limit=50, offset=1)
+        assert result["payments"] == full["payments"][1:]
+        
+        first = payment_service.get_payment_history("user-1", limit=1)
+        result = payment_service.get_payment_history(
+            "user-1", limit=50, cursor=first["next_cursor"], offset=5
+        )
+        assert result["payments"] == full["payments"][1:]
+    
+    def test_history_timestamps_are_iso(self, payment_service):
+        """Test history rows return ISO 8601 timestamps while cursors still page"""
+        result = payment_service.get_payment_history("user-1", limit=1)
+        
+        assert result["payments"][0]["created_at"] == "2024-11-01T10:00:00Z"
+        
+        result = payment_service.get_payment_history("user-1", limit=1, cursor=result["next_cursor"])
+        assert result["payments"][0]["created_at"] == "2024-10-01T10:00:00Z"
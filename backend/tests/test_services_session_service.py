@@ -0,0 +1,157 @@
+"""
+Session service tests with a real SQLite database
+"""
+
+import pytest
+from datetime import datetime, timedelta, timezone
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.models.base import Base
+from app.models.contact import Contact
+from app.models.meeting import Meeting
+from app.models.session import Session, SessionStatus
+from app.models.session_event import SessionEvent, EventType, LocationFlag
+from app.services.session_service import SessionService
+
+
+class TestSessionServiceReal:
+    """Session service tests using actual implementations"""
+    
+    @pytest.fixture
+    async def real_database(self):
+        """Create real database for testing"""
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:", echo=False)
+        
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        
+        async_session = sessionmaker(
+            engine, class_=AsyncSession, expire_on_commit=False
+        )
+        
+        yield async_session
+        
+        await engine.dispose()
+    
+    @pytest.fixture
+    def real_session_service(self):
+        """Create real session service instance"""
+        return SessionService()
+    
+    @pytest.fixture
+    async def real_contact_and_meeting(self, real_database):
+        """Create a contact and a meeting in the database"""
+        async with real_database() as db:
+            contact = Contact(
+                email="session-test@example.com",
+                first_name="Session",
+                last_name="Test",
+                consent_granted=True
+            )
+            meeting = Meeting(
+                name="Session Test Meeting",
+                address="1 Session St",
+                lat=40.7128,
+                lng=-74.0060,
+                radius_meters=100,
+                is_active=True
+            )
+            db.add_all([contact, meeting])
+            await db.commit()
+            return contact, meeting
+    
+    def _session(self, contact, meeting, status):
+        """Build a session at the meeting's destination"""
+        return Session(
+            contact_id=contact.id,
+            meeting_id=meeting.id,
+            dest_name=meeting.name,
+            dest_address=meeting.address,
+            dest_lat=meeting.lat,
+            dest_lng=meeting.lng,
+            status=status
+        )
+    
+    def _event(self, session, event_type, moment):
+        """Build a session event at a given client time"""
+        return SessionEvent(
+            session_id=session.id,
+            type=event_type,
+            ts_client=moment,
+            ts_server=moment,
+            lat=40.7128,
+            lng=-74.0060,
+            location_flag=LocationFlag.GRANTED
+        )
+    
+    @pytest.mark.asyncio
+    async def test_session_statistics_match_per_row_computation(
+        self, real_session_service, real_database, real_contact_and_meeting
+    ):
+        """Test the aggregate statistics against the per-session computation"""
+        contact, meeting = real_contact_and_meeting
+        start = datetime(2024, 11, 1, 10, 0, tzinfo=timezone.utc)
+        durations = [timedelta(minutes=45), timedelta(minutes=90, seconds=30), timedelta(hours=2)]
+        
+        async with real_database() as db:
+            events = []
+            for index, duration in enumerate(durations):
+                session = self._session(contact, meeting, SessionStatus.COMPLETED)
+                db.add(session)
+                await db.flush()
+                check_in = start + timedelta(days=index)
+                events += [
+                    self._event(session, EventType.CHECK_IN, check_in),
+                    self._event(session, EventType.CHECK_OUT, check_in + duration)
+                ]
+            
+            # A completed session without a check-out is not timed
+            untimed = self._session(contact, meeting, SessionStatus.COMPLETED)
+            active = self._session(contact, meeting, SessionStatus.ACTIVE)
+            # A status outside SessionStatus must not break the report
+            legacy = self._session(contact, meeting, "archived")
+            db.add_all([untimed, active, legacy])
+            await db.flush()
+            events.append(self._event(untimed, EventType.CHECK_IN, start))
+            db.add_all(events)
+            await db.commit()
+            
+            stats = await real_session_service.get_session_statistics(contact.id, db=db)
+        
+        # Per-session computation the aggregate query replaced
+        expected_minutes = sum(d.total_seconds() for d in durations) / len(durations) / 60
+        
+        assert stats["total_sessions"] == 6
+        assert stats["status_breakdown"] == {
+            SessionStatus.COMPLETED.value: 4,
+            SessionStatus.ACTIVE.value: 1,
+            "archived": 1
+        }
+        assert stats["completed_sessions"] == len(durations)
+        assert stats["average_duration_minutes"] == round(expected_minutes, 2)
+    
+    @pytest.mark.asyncio
+    async def test_end_session_refreshes_loaded_session(
+        self, real_session_service, real_database, real_contact_and_meeting
+    ):
+        """Test end_session updates a session object already held by the caller"""
+        contact, meeting = real_contact_and_meeting
+        
+        async with real_database() as db:
+            session = self._session(contact, meeting, SessionStatus.ACTIVE)
+            session.session_notes = "Arrived early"
+            db.add(session)
+            await db.commit()
+            
+            ended = await real_session_service.end_session(session.id, reason="Left early", db=db)
+            
+            assert ended == True
+            assert session.status == SessionStatus.ENDED
+            assert session.session_notes == "Arrived early\nEnded: Left early"
+    
+    @pytest.mark.asyncio
+    async def test_end_session_not_found(self, real_session_service, real_database):
+        """Test ending a missing session returns False"""
+        async with real_database() as db:
+            assert await real_session_service.end_session("missing-session-id", db=db) == False
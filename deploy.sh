@@ -69,7 +69,8 @@ required_vars=(
     "GHL_API_KEY"
     "GOOGLE_MAPS_API_KEY"
     "SENDGRID_API_KEY"
-    "FCM_SERVER_KEY"
+    "FCM_PROJECT_ID"
+    "FCM_SERVICE_ACCOUNT_FILE"
 )
 
 for var in "${required_vars[@]}"; do